@@ -6,10 +6,17 @@ Handles customer verification and data retrieval from Nasabah API
 import logging
 import requests
 import re
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Compiled once at import; normalize_email runs for every inbound message
+_ANGLE_ADDR_RE = re.compile(r'<([^>]+)>')
+
 # Import config with environment variable fallback
 import os
 
@@ -46,7 +53,7 @@ def normalize_email(email):
     
     # Remove any angle brackets or display names
     # Extract email from formats like "Name <email@domain.com>"
-    email_match = re.search(r'<([^>]+)>', normalized)
+    email_match = _ANGLE_ADDR_RE.search(normalized)
     if email_match:
         normalized = email_match.group(1)
     
@@ -56,29 +63,87 @@ def normalize_email(email):
     return normalized
 
 
+# Persistent session for the Nasabah API: pooled connections avoid a fresh
+# TCP+TLS handshake per lookup, and transient 5xx responses retry briefly.
+_NASABAH_SESSION = requests.Session()
+_NASABAH_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+))
+# Connect fast or fail fast; leave most of the old 5s budget for the read
+NASABAH_TIMEOUT = (1.0, 4.0)
+
+# In-process TTL cache for customer lookups: the same sender often emails
+# several times within minutes and the Nasabah API is the slowest dependency
+# in the reply path. Keyed by normalized email, guarded for threaded servers.
+_CUSTOMER_CACHE = {}
+_CUSTOMER_CACHE_LOCK = threading.RLock()
+CUSTOMER_CACHE_TTL_SECONDS = 900
+# Not-a-customer results expire sooner so a freshly registered customer
+# isn't stuck with a stale negative for 15 minutes
+CUSTOMER_CACHE_NEGATIVE_TTL_SECONDS = 120
+CUSTOMER_CACHE_MAX_ENTRIES = 10000
+
+
+def _customer_cache_get(email):
+    """Return a cached (is_customer, customer_data) tuple or None if stale/missing."""
+    with _CUSTOMER_CACHE_LOCK:
+        entry = _CUSTOMER_CACHE.get(email)
+        if entry is None:
+            return None
+        cached_at, result = entry
+        ttl = CUSTOMER_CACHE_TTL_SECONDS if result[0] else CUSTOMER_CACHE_NEGATIVE_TTL_SECONDS
+        if time.time() - cached_at > ttl:
+            del _CUSTOMER_CACHE[email]
+            return None
+        return result
+
+
+def _customer_cache_put(email, result):
+    """Store a lookup result, evicting the oldest entry when full."""
+    with _CUSTOMER_CACHE_LOCK:
+        if len(_CUSTOMER_CACHE) >= CUSTOMER_CACHE_MAX_ENTRIES:
+            oldest = min(_CUSTOMER_CACHE, key=lambda k: _CUSTOMER_CACHE[k][0])
+            del _CUSTOMER_CACHE[oldest]
+        _CUSTOMER_CACHE[email] = (time.time(), result)
+
+
+def clear_customer_cache():
+    """Drop all cached customer lookups (for tests and manual invalidation)."""
+    with _CUSTOMER_CACHE_LOCK:
+        _CUSTOMER_CACHE.clear()
+
+
 def check_customer_status(sender_email):
     """
     Check if sender is a verified customer and get their data.
-    
+
     Args:
         sender_email (str): Email address of the sender
-        
+
     Returns:
         tuple: (is_customer, customer_data)
             - is_customer (bool): True if verified customer
             - customer_data (dict): Customer data from API or None
     """
     logger.info(f"Starting customer status check for: {sender_email}")
-    
+
     # Normalize email for consistent comparison
     normalized_email = normalize_email(sender_email)
     logger.info(f"Normalized email: {normalized_email}")
-    
+
     # Return early if email is empty after normalization
     if not normalized_email:
         logger.warning("Empty email after normalization, cannot check customer status")
         return False, None
-        
+
+    # Serve repeat lookups from the TTL cache
+    cached = _customer_cache_get(normalized_email)
+    if cached is not None:
+        logger.info(f"Customer status cache hit for: {normalized_email}")
+        return cached
+
     try:
         # Check if config is available
         if not config:
@@ -98,8 +163,9 @@ def check_customer_status(sender_email):
         logger.info(f"Making API request to: {config.NASABAH_API_URL}")
         logger.info(f"Request params: {params}")
         
-        # Make API request
-        response = requests.get(config.NASABAH_API_URL, headers=headers, params=params, timeout=5)
+        # Make API request on the pooled session
+        response = _NASABAH_SESSION.get(config.NASABAH_API_URL, headers=headers, params=params,
+                                        timeout=NASABAH_TIMEOUT)
         
         logger.info(f"API Response Status: {response.status_code}")
         logger.info(f"API Response Headers: {dict(response.headers)}")
@@ -120,9 +186,11 @@ def check_customer_status(sender_email):
                 if len(response_data['data']) > 0:
                     customer_data = response_data['data'][0]
                     logger.info(f"Customer found: {customer_data.get('nama', 'Unknown')} - Status: {customer_data.get('status', 'Unknown')}")
+                    _customer_cache_put(normalized_email, (True, response_data))
                     return True, response_data
                 else:
                     logger.info(f"No customer data found for email: {normalized_email}")
+                    _customer_cache_put(normalized_email, (False, None))
                     return False, None
             else:
                 logger.warning(f"Unexpected response format: {response_data}")
@@ -131,6 +199,7 @@ def check_customer_status(sender_email):
         # Status 404 or other error codes
         elif response.status_code == 404:
             logger.info(f"Customer not found (404) for email: {normalized_email}")
+            _customer_cache_put(normalized_email, (False, None))
             return False, None
         else:
             logger.warning(f"API returned status {response.status_code}: {response.text}")
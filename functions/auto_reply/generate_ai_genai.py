@@ -4,24 +4,14 @@ Alternative AI response generation using Google GenAI SDK
 """
 
 import os
+import string
+import threading
 from google import genai
 from google.genai import types
 
-def generate_ai_response_genai(email_data):
-    """Menghasilkan respons AI menggunakan Google GenAI SDK."""
-    try:
-        print("Menginisialisasi klien Google GenAI")
-        
-        # Dapatkan kunci API dari environment atau Secret Manager
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            print("Kunci GEMINI_API_KEY tidak ditemukan, kembali ke Vertex AI")
-            return None
-        
-        client = genai.Client(api_key=api_key)
-        
-        # Buat prompt dalam Bahasa Indonesia
-        prompt = f"""Anda adalah asisten email AI yang membantu. Buat balasan yang sopan dan profesional untuk email ini.
+# Template prompt dan konfigurasi generasi bersifat konstan; bangun sekali
+# di level modul, hanya substitusi field email yang dilakukan per panggilan
+_PROMPT_TMPL = string.Template("""Anda adalah asisten email AI yang membantu. Buat balasan yang sopan dan profesional untuk email ini.
 
 PENTING:
 - Balas dalam Bahasa Indonesia.
@@ -29,9 +19,9 @@ PENTING:
 - Langsung mulai dengan "Kepada [nama]" atau sapaan yang sesuai.
 - Jika ada pertanyaan tentang saldo, berikan informasi saldo yang sebenarnya, bukan placeholder "[Jumlah Saldo Anda]".
 
-Dari: {email_data['from']}
-Subjek: {email_data['subject']}
-Pesan: {email_data['body']}
+Dari: ${sender}
+Subjek: ${subject}
+Pesan: ${body}
 
 Balasan Anda harus:
 - Mengakui email mereka
@@ -39,8 +29,49 @@ Balasan Anda harus:
 - Ringkas (2-3 kalimat)
 - Diakhiri dengan sopan
 
-Balasan:"""
+Balasan:""")
+
+_GEN_CONFIG = types.GenerateContentConfig(
+    thinking_config=types.ThinkingConfig(
+        thinking_budget=0,
+    ),
+)
+
+# Client dibangun sekali dan dipakai ulang; setiap pembuatan klien baru
+# membayar OAuth discovery dan setup channel (~ratusan ms)
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+def _get_client(api_key):
+    """Return the shared GenAI client, creating it on first use."""
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = genai.Client(api_key=api_key)
+    return _CLIENT
+
+def generate_ai_response_genai(email_data):
+    """Menghasilkan respons AI menggunakan Google GenAI SDK."""
+    try:
+        print("Menginisialisasi klien Google GenAI")
+        
+        # Dapatkan kunci API dari environment atau Secret Manager
+        api_key = os.environ.get("GEMINI_API_KEY")
+        if not api_key:
+            print("Kunci GEMINI_API_KEY tidak ditemukan, kembali ke Vertex AI")
+            return None
         
+        client = _get_client(api_key)
+
+        # Buat prompt dalam Bahasa Indonesia dari template konstan
+        prompt = _PROMPT_TMPL.substitute(
+            sender=email_data['from'],
+            subject=email_data['subject'],
+            body=email_data['body'],
+        )
+
+        # Content harus dibuat baru karena isinya bervariasi per email
         contents = [
             types.Content(
                 role="user",
@@ -49,24 +80,20 @@ Balasan:"""
                 ],
             ),
         ]
-        
-        generate_content_config = types.GenerateContentConfig(
-            thinking_config=types.ThinkingConfig(
-                thinking_budget=0,
-            ),
-        )
-        
+
         print("Membuat respons AI dengan GenAI SDK...")
-        response_text = ""
-        
+        # Kumpulkan chunk dalam list lalu join sekali; += pada str menyalin
+        # ulang seluruh respons untuk setiap chunk
+        parts = []
+
         for chunk in client.models.generate_content_stream(
             model="gemini-2.5-flash-lite",
             contents=contents,
-            config=generate_content_config,
+            config=_GEN_CONFIG,
         ):
-            response_text += chunk.text
-        
-        response_text = response_text.strip()
+            parts.append(chunk.text)
+
+        response_text = "".join(parts).strip()
         print(f"Berhasil membuat respons AI: {response_text[:100]}...")
         return response_text
         
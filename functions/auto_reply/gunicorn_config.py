@@ -8,9 +8,10 @@ import multiprocessing
 timeout = 300  # Increase from default 30 seconds to 300 seconds to match Cloud Run timeout
 graceful_timeout = 120
 
-# Worker settings - use single worker with threads for Cloud Run
-workers = 1
-threads = 8
+# Worker settings - preforked workers with threads; preload_app below means
+# the workers share the already-imported modules via copy-on-write
+workers = 2
+threads = 16
 worker_class = 'gthread'  # Use gthread instead of sync for better thread handling
 
 # Logging - more verbose for debugging
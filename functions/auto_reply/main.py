@@ -6,18 +6,22 @@ Triggered by Pub/Sub notifications from Gmail API watch
 import base64
 import json
 import os
+import re
 import time
 import logging
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask, request, jsonify
+from google.auth.exceptions import RefreshError
 from google.cloud import secretmanager
+import google_auth_httplib2
+import httplib2
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from google.oauth2.credentials import Credentials
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from google.cloud import aiplatform
-import requests
+from email.message import EmailMessage
+from email.utils import parseaddr
 
 # Configure logging first before any logger usage
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -48,12 +52,14 @@ except ImportError:
         logger.error("Failed to import config.py - file not found or import error")
         config = None
 
-# Try to import optional GenAI SDK, fallback to Vertex AI only
+# Optional fast JSON parser for the Pub/Sub push hot path
 try:
-    from google import genai
-    logger.info("Google GenAI SDK available")
+    import orjson
+    _json_loads = orjson.loads
+    logger.info("orjson available, using it for Pub/Sub payload parsing")
 except ImportError:
-    logger.info("GenAI SDK not available, will use Vertex AI only")
+    _json_loads = json.loads
+    logger.info("orjson not available, falling back to stdlib json")
 
 # Print Python version for debugging
 logger.info(f"Python version: {sys.version}")
@@ -85,9 +91,25 @@ ALLOWED_SENDERS = [  # Whitelist of allowed sender domains (optional)
 ]
 AUTO_REPLY_LABEL = 'Auto-Replied'
 
+# Label filters for incoming-message eligibility checks (set ops instead of
+# per-call any() generators on the hot path)
+_REQUIRED_LABELS = frozenset({'INBOX', 'UNREAD'})
+_EXCLUDED_LABELS = frozenset({'SENT', 'DRAFT', 'SPAM', 'TRASH'})
+
 # Privacy & safety flags
 STRICT_PRIVACY = True  # Enforce strict prompt rules and output sanitization
 
+# Precompiled single-pass matchers for the content filters in
+# is_email_allowed; one scan per string instead of one per keyword
+_SPAM_RE = re.compile(
+    r'\b(?:viagra|casino|lottery|winner|urgent|click here|free money)\b',
+    re.IGNORECASE)
+_AUTO_REPLY_RE = re.compile(
+    r'(?:auto-reply|automatic reply|auto reply|out of office|automated response|'
+    r'do not reply|noreply|no-reply|mailer-daemon|mail delivery|delivery status|'
+    r'delivery failure|undeliverable|returned mail)',
+    re.IGNORECASE)
+
 def is_email_allowed(email_data):
     """Check if email meets security criteria for auto-reply."""
     try:
@@ -166,15 +188,8 @@ def is_email_allowed(email_data):
             logger.info("Email has explicit auto-reply header")
             return False, "Email is an automatic reply (explicit header)"
 
-        # Common auto-reply indicators in subject/body
-        auto_reply_indicators = [
-            'auto-reply', 'automatic reply', 'auto reply', 'out of office',
-            'automated response', 'do not reply', 'noreply', 'no-reply',
-            'mailer-daemon', 'mail delivery', 'delivery status', 'delivery failure',
-            'undeliverable', 'returned mail'
-        ]
-
-        if any(indicator in subject.lower() or indicator in body.lower() for indicator in auto_reply_indicators):
+        # Common auto-reply indicators in subject/body (single-pass regex)
+        if _AUTO_REPLY_RE.search(subject) or _AUTO_REPLY_RE.search(body):
             logger.info("Email appears to be an automatic reply based on content")
             return False, "Email is an automatic reply (content indicators)"
 
@@ -185,9 +200,8 @@ def is_email_allowed(email_data):
                 logger.info(f"Sender domain not in whitelist: {sender_domain}")
                 return False, "Sender domain not allowed"
 
-        # Check for spam indicators
-        spam_keywords = ['viagra', 'casino', 'lottery', 'winner', 'urgent', 'click here', 'free money']
-        if any(keyword in subject or keyword in body for keyword in spam_keywords):
+        # Check for spam indicators (single-pass regex)
+        if _SPAM_RE.search(subject) or _SPAM_RE.search(body):
             logger.info("Email contains spam keywords")
             return False, "Email contains spam keywords"
 
@@ -222,20 +236,102 @@ def is_email_recent(message):
         logger.error(f"Error checking email age: {e}")
         return False  # Err on the side of caution
 
-def get_credentials_from_secret_manager():
-    """Get OAuth credentials from Secret Manager."""
+# Credentials are cached across warm invocations with a TTL and refreshed
+# stale-while-revalidate: a near-stale hit returns the cached object and
+# kicks off a daemon-thread refresh, so the Secret Manager RPC is off the
+# request path entirely. The Secret Manager client itself is also reused.
+_credentials_lock = threading.Lock()
+_cached_credentials = None
+_credentials_fetched_at = 0.0
+_credentials_refreshing = False
+_sm_client = None
+CREDENTIALS_TTL_SECONDS = 3300  # just under 1h, inside OAuth refresh window
+
+def _get_sm_client():
+    global _sm_client
+    if _sm_client is None:
+        _sm_client = secretmanager.SecretManagerServiceClient()
+    return _sm_client
+
+def _fetch_credentials():
+    """Fetch and parse the OAuth token secret (one Secret Manager RPC)."""
     logger.info(f"Getting credentials from Secret Manager: {SECRET_NAME} in project {PROJECT_ID}")
-    client = secretmanager.SecretManagerServiceClient()
     name = f"projects/{PROJECT_ID}/secrets/{SECRET_NAME}/versions/latest"
+    response = _get_sm_client().access_secret_version(request={"name": name})
+    token_data = json.loads(response.payload.data.decode("UTF-8"))
+    logger.info("Successfully retrieved credentials from Secret Manager")
+    return Credentials.from_authorized_user_info(token_data)
 
+def _refresh_credentials_in_background():
+    global _cached_credentials, _credentials_fetched_at, _credentials_refreshing
     try:
-        response = client.access_secret_version(request={"name": name})
-        token_data = json.loads(response.payload.data.decode("UTF-8"))
-        logger.info("Successfully retrieved credentials from Secret Manager")
-        return Credentials.from_authorized_user_info(token_data)
+        creds = _fetch_credentials()
+        with _credentials_lock:
+            _cached_credentials = creds
+            _credentials_fetched_at = time.time()
     except Exception as e:
-        logger.error(f"Error accessing secret: {e}")
-        raise
+        # Keep serving the cached credentials; they auto-refresh their own
+        # access token, so a failed secret re-read is not fatal
+        logger.warning(f"Background credential refresh failed, keeping cached: {e}")
+    finally:
+        with _credentials_lock:
+            _credentials_refreshing = False
+
+def get_credentials_from_secret_manager():
+    """Get OAuth credentials from Secret Manager, cached with a TTL."""
+    global _cached_credentials, _credentials_fetched_at, _credentials_refreshing
+
+    with _credentials_lock:
+        cached = _cached_credentials
+        age = time.time() - _credentials_fetched_at
+        if cached is not None and age > CREDENTIALS_TTL_SECONDS and not _credentials_refreshing:
+            # Stale: serve the cached object but refresh it off-path
+            _credentials_refreshing = True
+            threading.Thread(target=_refresh_credentials_in_background, daemon=True).start()
+    if cached is not None:
+        return cached
+
+    with _credentials_lock:
+        if _cached_credentials is not None:
+            return _cached_credentials
+        try:
+            _cached_credentials = _fetch_credentials()
+            _credentials_fetched_at = time.time()
+            return _cached_credentials
+        except Exception as e:
+            logger.error(f"Error accessing secret: {e}")
+            raise
+
+def invalidate_cached_credentials():
+    """Drop the cached credentials (e.g. after a RefreshError) so the next
+    request re-reads the secret."""
+    global _cached_credentials, _credentials_fetched_at
+    with _credentials_lock:
+        _cached_credentials = None
+        _credentials_fetched_at = 0.0
+
+# One AuthorizedHttp transport and built service per thread and credential:
+# httplib2.Http is not thread-safe (google-api-python-client requires a new
+# Http per thread), so message-pool workers and concurrent push jobs must
+# each talk over their own socket. Within a thread, Gmail API calls still
+# reuse the same TLS connection and discovery document instead of rebuilding
+# both per request. httplib2's cache directory lives under /tmp, the only
+# writable path on Cloud Run.
+_thread_transports = threading.local()
+
+def build_gmail_service(credentials):
+    """Build the Gmail API service on this thread's connection-reusing transport."""
+    services = getattr(_thread_transports, 'by_credential', None)
+    if services is None:
+        services = _thread_transports.by_credential = {}
+    service = services.get(id(credentials))
+    if service is None:
+        authorized_http = google_auth_httplib2.AuthorizedHttp(
+            credentials, http=httplib2.Http(cache='/tmp/.httpcache')
+        )
+        service = build('gmail', 'v1', http=authorized_http)
+        services[id(credentials)] = service
+    return service
 
 def get_message(service, msg_id):
     """Get a Gmail message by ID."""
@@ -250,59 +346,51 @@ def get_message(service, msg_id):
         print(f"Error getting message {msg_id}: {e}")
         return None
 
-def extract_email_data(message):
-    """Extract relevant data from a Gmail message."""
-    headers = message['payload']['headers']
+# Headers that indicate auto-generated emails, mapped to email_data keys
+_AUTO_GENERATED_HEADERS = (
+    ('auto-submitted', 'auto_submitted'),
+    ('x-auto-response-suppress', 'x_auto_response_suppress'),
+    ('precedence', 'precedence'),
+    ('x-autoreply', 'x_autoreply'),
+    ('x-autorespond', 'x_autorespond'),
+)
+
+def extract_email_headers(message):
+    """Extract header data from a Gmail message without decoding the body."""
+    # One pass over the header list, then O(1) lookups
+    headers = {h['name'].lower(): h['value'] for h in message['payload']['headers']}
 
-    # Extract headers
     data = {
         'id': message['id'],
         'threadId': message['threadId'],
-        'subject': '',
-        'from': '',
-        'to': '',
+        'subject': headers.get('subject', ''),
+        'from': headers.get('from', ''),
+        'to': headers.get('to', ''),
         'body': '',
-        'reply_to': ''
+        # If no reply-to, use from
+        'reply_to': headers.get('reply-to') or headers.get('from', ''),
     }
 
-    # Get header values
-    for header in headers:
-        name = header['name'].lower()
-        if name == 'subject':
-            data['subject'] = header['value']
-        elif name == 'from':
-            data['from'] = header['value']
-        elif name == 'to':
-            data['to'] = header['value']
-        elif name == 'reply-to':
-            data['reply_to'] = header['value']
-        # Capture headers that indicate auto-generated emails
-        elif name == 'auto-submitted':
-            data['auto_submitted'] = header['value']
-        elif name == 'x-auto-response-suppress':
-            data['x_auto_response_suppress'] = header['value']
-        elif name == 'precedence':
-            data['precedence'] = header['value']
-        elif name == 'x-autoreply':
-            data['x_autoreply'] = header['value']
-        elif name == 'x-autorespond':
-            data['x_autorespond'] = header['value']
-
-    # If no reply-to, use from
-    if not data['reply_to']:
-        data['reply_to'] = data['from']
-
-    # Extract body
+    for header_name, key in _AUTO_GENERATED_HEADERS:
+        if header_name in headers:
+            data[key] = headers[header_name]
+
+    return data
+
+def extract_email_body(message):
+    """Decode the plain-text body from a Gmail message payload."""
     if 'parts' in message['payload']:
         for part in message['payload']['parts']:
             if part['mimeType'] == 'text/plain':
-                body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                data['body'] = body
-                break
+                return base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
     elif 'body' in message['payload'] and 'data' in message['payload']['body']:
-        body = base64.urlsafe_b64decode(message['payload']['body']['data']).decode('utf-8')
-        data['body'] = body
+        return base64.urlsafe_b64decode(message['payload']['body']['data']).decode('utf-8')
+    return ''
 
+def extract_email_data(message):
+    """Extract relevant data (headers + body) from a Gmail message."""
+    data = extract_email_headers(message)
+    data['body'] = extract_email_body(message)
     return data
 
 def strip_quoted_text(body):
@@ -376,35 +464,97 @@ def normalize_email_body(text):
         return text.strip()
     except Exception:
         return text
-def has_auto_reply_label(service, msg_id):
-    """Check if message already has auto-reply label."""
+# ETag of the last labels().list() response plus its parsed body. Labels
+# rarely change, so a conditional GET usually comes back 304 with no body
+# to re-parse.
+_labels_cache_lock = threading.Lock()
+_labels_etag = None
+_labels_cached = None
+
+def list_labels(service):
+    """Fetch the label list with an ETag-based conditional GET.
+
+    Sends If-None-Match with the last seen ETag; on 304 the cached parsed
+    response is returned without transferring or re-parsing the body. Falls
+    back to a plain execute() if the transport doesn't cooperate.
+    """
+    global _labels_etag, _labels_cached
+    request_obj = service.users().labels().list(userId='me')
+    with _labels_cache_lock:
+        etag, cached = _labels_etag, _labels_cached
     try:
-        # Get message to check labels
-        message = service.users().messages().get(userId='me', id=msg_id).execute()
+        headers = {'If-None-Match': etag} if (etag and cached is not None) else {}
+        resp, content = service._http.request(request_obj.uri, 'GET', headers=headers)
+        if resp.status == 304 and cached is not None:
+            return cached
+        if resp.status == 200:
+            result = json.loads(content)
+            with _labels_cache_lock:
+                _labels_etag = resp.get('etag')
+                _labels_cached = result
+            return result
+    except Exception as e:
+        logger.debug(f"Conditional labels().list() failed, falling back to plain request: {e}")
+    return request_obj.execute()
 
-        # Check if label exists
-        if 'labelIds' in message and AUTO_REPLY_LABEL in message['labelIds']:
-            return True
+# Resolved label ids, keyed by (user, label name). Label ids are static for
+# the life of a mailbox, so one labels().list() per warm instance is enough.
+_LABEL_ID_CACHE = {}
+_LABEL_ID_CACHE_LOCK = threading.Lock()
 
-        # Get all labels to find the auto-reply label ID
-        labels = service.users().labels().list(userId='me').execute()
+# Dedicated single worker for the label pre-resolve below. Submitting it to
+# _EXECUTOR starved it behind whole push jobs (with four concurrent pushes
+# every message waited the full 30s timeout), and _MESSAGE_POOL can deadlock
+# when all of its workers are the ones waiting on the future. One thread is
+# plenty: after the first resolve the answer comes from _LABEL_ID_CACHE.
+_LABEL_EXECUTOR = ThreadPoolExecutor(max_workers=1)
 
-        # Check if our label exists
-        label_id = None
-        for label in labels.get('labels', []):
-            if label['name'] == AUTO_REPLY_LABEL:
-                label_id = label['id']
-                break
+def get_or_create_label_id(service, label_name=AUTO_REPLY_LABEL, user_id='me'):
+    """Resolve a label name to its id, creating the label if needed.
 
-        # Create label if it doesn't exist
-        if not label_id:
-            label = service.users().labels().create(
-                userId='me',
-                body={'name': AUTO_REPLY_LABEL}
-            ).execute()
+    The id is cached at module scope so repeat calls cost nothing.
+    """
+    cache_key = (user_id, label_name)
+    with _LABEL_ID_CACHE_LOCK:
+        label_id = _LABEL_ID_CACHE.get(cache_key)
+    if label_id is not None:
+        return label_id
+
+    labels = list_labels(service)
+    label_id = None
+    for label in labels.get('labels', []):
+        if label['name'] == label_name:
             label_id = label['id']
+            break
+    if label_id is None:
+        label = service.users().labels().create(
+            userId=user_id,
+            body={'name': label_name}
+        ).execute()
+        label_id = label['id']
+        logger.info(f"Created label {label_name}: {label_id}")
 
-        # Check if message has this label
+    with _LABEL_ID_CACHE_LOCK:
+        _LABEL_ID_CACHE[cache_key] = label_id
+    return label_id
+
+def has_auto_reply_label(service, msg_id, message=None):
+    """Check if message already has auto-reply label.
+
+    message, when provided, is the already-fetched message dict so no extra
+    messages().get() round trip is needed.
+    """
+    try:
+        # Get message to check labels unless the caller already has it
+        if message is None:
+            message = service.users().messages().get(userId='me', id=msg_id).execute()
+
+        # Check if label exists
+        if 'labelIds' in message and AUTO_REPLY_LABEL in message['labelIds']:
+            return True
+
+        # Resolve the auto-reply label ID and check for it
+        label_id = get_or_create_label_id(service)
         if 'labelIds' in message and label_id in message['labelIds']:
             return True
 
@@ -413,27 +563,12 @@ def has_auto_reply_label(service, msg_id):
         print(f"Error checking labels: {e}")
         return False  # Assume not replied to be safe
 
-def add_auto_reply_label(service, msg_id):
+def add_auto_reply_label(service, msg_id, label_id=None):
     """Add auto-reply label to message to prevent duplicate replies."""
     try:
-        # Get all labels to find the auto-reply label ID
-        labels = service.users().labels().list(userId='me').execute()
-
-        # Check if our label exists
-        label_id = None
-        for label in labels.get('labels', []):
-            if label['name'] == AUTO_REPLY_LABEL:
-                label_id = label['id']
-                break
-
-        # Create label if it doesn't exist
-        if not label_id:
-            label = service.users().labels().create(
-                userId='me',
-                body={'name': AUTO_REPLY_LABEL}
-            ).execute()
-            label_id = label['id']
-            logger.info(f"Created auto-reply label: {label_id}")
+        # Resolve the auto-reply label ID unless the caller already has it
+        if label_id is None:
+            label_id = get_or_create_label_id(service)
 
         # Add label to message
         service.users().messages().modify(
@@ -451,6 +586,42 @@ def add_auto_reply_label(service, msg_id):
 
 # Customer checking functions moved to customer_service.py module
 
+# Vertex AI setup is per-process, not per-request: init once, cache one
+# GenerativeModel per model name and a single GenerationConfig, so each call
+# reuses the SDK's auth and connection state instead of rebuilding it.
+_vertex_lock = threading.Lock()
+_vertex_initialized = False
+_generative_models = {}
+_generation_config = None
+
+def _get_generative_model(model_name):
+    """Lazily initialize Vertex AI and return a cached GenerativeModel."""
+    global _vertex_initialized
+    # Lazy import to avoid test-time import errors when Vertex AI SDK isn't installed
+    import vertexai
+    from vertexai.generative_models import GenerativeModel
+    with _vertex_lock:
+        if not _vertex_initialized:
+            vertexai.init(project=PROJECT_ID, location="us-central1")
+            _vertex_initialized = True
+        model = _generative_models.get(model_name)
+        if model is None:
+            model = GenerativeModel(model_name)
+            _generative_models[model_name] = model
+    return model
+
+def _get_generation_config():
+    """Return the shared GenerationConfig (constant across requests)."""
+    global _generation_config
+    if _generation_config is None:
+        from vertexai.generative_models import GenerationConfig
+        _generation_config = GenerationConfig(
+            temperature=0.7,
+            top_p=0.8,
+            max_output_tokens=256,
+        )
+    return _generation_config
+
 def generate_ai_response(email_data, is_nasabah, customer_info):
     """Generate an AI response using GenAI SDK with Vertex AI backend.
 
@@ -460,12 +631,7 @@ def generate_ai_response(email_data, is_nasabah, customer_info):
         customer_info (dict): Customer info from customer_service module
     """
     try:
-        logger.info("Initializing Vertex AI for per-email chat session")
-        # Lazy import to avoid test-time import errors when Vertex AI SDK isn't installed
-        import vertexai
-        from vertexai.generative_models import GenerativeModel, GenerationConfig
-        # Initialize Vertex AI explicitly (stateless per request)
-        vertexai.init(project=PROJECT_ID, location="us-central1")
+        logger.info("Preparing Vertex AI for per-email chat session")
 
         # Extract customer info from customer_service module
         customer_name = customer_info.get('name', 'Nasabah') if customer_info else 'Nasabah'
@@ -517,51 +683,29 @@ Hormat kami,
 """
 
         logger.info(f"Using model: {VERTEX_MODEL} with isolated chat session for {session_id}")
-        # Start an isolated chat session per email subject to ensure privacy
-        model = GenerativeModel(VERTEX_MODEL)
+        # Start an isolated chat session per email subject to ensure privacy;
+        # the model object itself is a shared singleton
+        model = _get_generative_model(VERTEX_MODEL)
         chat = model.start_chat(history=[])
 
-        # Generation parameters (kept modest) - using generation_config for proper API compatibility
-        generation_config = GenerationConfig(
-            temperature=0.7,
-            top_p=0.8,
-            max_output_tokens=256,
-        )
-
+        # Generation parameters (kept modest) - shared config, constant across requests.
+        # Non-streaming: nobody consumes partial output here, and a single
+        # request/response skips the per-chunk Python overhead for these
+        # short 256-token replies.
         gen_kwargs = {
-            "generation_config": generation_config,
-            "stream": True,
+            "generation_config": _get_generation_config(),
         }
 
-        # Stream the response safely
-        logger.info("Sending message to Vertex AI chat session (streaming)")
-        response_text = ""
-        try:
-            for chunk in chat.send_message(prompt, **gen_kwargs):
-                try:
-                    if hasattr(chunk, 'text') and chunk.text:
-                        response_text += chunk.text
-                except Exception:
-                    # be resilient to chunk types
-                    pass
-            response_text = response_text.strip()
-            if STRICT_PRIVACY:
-                response_text = sanitize_generated_text(response_text)
-            logger.info(f"Successfully generated AI response: {response_text[:100]}...")
-            return response_text
-        except Exception as stream_err:
-            logger.error(f"Vertex AI streaming error on model {VERTEX_MODEL}: {stream_err}", exc_info=True)
-
-        # Fallback: try non-streaming on configured model, then alternate models
-        fallback_models = [VERTEX_MODEL, 'gemini-1.5-flash', 'gemini-1.5-flash-002']
-        for m in fallback_models:
+        # Try the configured model first, then alternates
+        candidate_models = [VERTEX_MODEL, 'gemini-1.5-flash', 'gemini-1.5-flash-002']
+        for m in candidate_models:
             try:
                 if m != VERTEX_MODEL:
                     logger.info(f"Trying fallback model: {m}")
-                    model = GenerativeModel(m)
+                    model = _get_generative_model(m)
                     chat = model.start_chat(history=[])
-                nonstream_kwargs = {k: v for k, v in gen_kwargs.items() if k != 'stream'}
-                resp = chat.send_message(prompt, **nonstream_kwargs)
+                logger.info(f"Sending message to Vertex AI chat session (model {m})")
+                resp = chat.send_message(prompt, **gen_kwargs)
                 # resp could be a single object with .text
                 text = getattr(resp, 'text', '') or ''
                 text = text.strip()
@@ -569,10 +713,10 @@ Hormat kami,
                     continue
                 if STRICT_PRIVACY:
                     text = sanitize_generated_text(text)
-                logger.info(f"Generated AI response via fallback {m}: {text[:100]}...")
+                logger.info(f"Successfully generated AI response via {m}: {text[:100]}...")
                 return text
             except Exception as e2:
-                logger.error(f"Fallback generation failed on model {m}: {e2}")
+                logger.error(f"Generation failed on model {m}: {e2}")
                 continue
 
     except Exception as e:
@@ -583,8 +727,12 @@ Hormat kami,
     logger.info("Using fallback response due to AI generation issues")
     return fallback_response
 
-def send_reply(service, email_data, response_text):
-    """Send an auto-reply email."""
+def send_reply(service, email_data, response_text, label_id=None):
+    """Send an auto-reply email.
+
+    label_id, when provided, is the pre-resolved Auto-Replied label id so no
+    extra labels().list() round trip is needed after sending.
+    """
     try:
         # Validate response_text
         if not response_text or response_text is None:
@@ -599,10 +747,12 @@ def send_reply(service, email_data, response_text):
         except Exception as e:
             logger.warning(f"Label re-check before send failed: {e}")
 
-        # Create message
-        message = MIMEMultipart()
-        message['to'] = email_data['reply_to']
-        message['subject'] = f"Re: {email_data['subject']}"
+        # Create message; a single-part EmailMessage skips the multipart
+        # boundary generation and extra headers of the old MIMEMultipart,
+        # shrinking the base64 payload for what is plain text anyway
+        message = EmailMessage()
+        message['To'] = email_data['reply_to']
+        message['Subject'] = f"Re: {email_data['subject']}"
 
         # Use PRIMARY_FROM if configured, otherwise use alias
         from_addr = 'squidgamecs2025@gmail.com'
@@ -647,7 +797,7 @@ def send_reply(service, email_data, response_text):
         message['X-AutoReply'] = 'yes'
 
         # Add body
-        message.attach(MIMEText(str(response_text)))
+        message.set_content(str(response_text))
 
         # Encode message
         encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
@@ -658,23 +808,9 @@ def send_reply(service, email_data, response_text):
             body={'raw': encoded_message, 'threadId': email_data['threadId']}
         ).execute()
 
-        # Get all labels to find the auto-reply label ID
-        labels = service.users().labels().list(userId='me').execute()
-
-        # Check if our label exists
-        label_id = None
-        for label in labels.get('labels', []):
-            if label['name'] == AUTO_REPLY_LABEL:
-                label_id = label['id']
-                break
-
-        # Create label if it doesn't exist
-        if not label_id:
-            label = service.users().labels().create(
-                userId='me',
-                body={'name': AUTO_REPLY_LABEL}
-            ).execute()
-            label_id = label['id']
+        # Resolve the auto-reply label ID unless the caller already has it
+        if label_id is None:
+            label_id = get_or_create_label_id(service)
 
         # Add label to original message
         service.users().messages().modify(
@@ -689,11 +825,19 @@ def send_reply(service, email_data, response_text):
         logger.error(f"Error sending reply: {e}", exc_info=True)
         return None
 
-def process_message(service, msg_id):
-    """Process a single message with security filters."""
+def process_message(service, msg_id, message=None, metadata_only=False):
+    """Process a single message with security filters.
+
+    message, when provided, is the already-fetched message (e.g. from the
+    batched history scan) so no extra messages().get() is issued up front.
+    metadata_only marks it as a headers+labels fetch, in which case the full
+    body is only downloaded once every filter has passed.
+    """
     try:
-        # Get message
-        message = get_message(service, msg_id)
+        # Get message unless the caller already fetched it
+        if message is None:
+            message = get_message(service, msg_id)
+            metadata_only = False
 
         if not message:
             logger.warning(f"Could not retrieve message {msg_id}, skipping")
@@ -701,7 +845,7 @@ def process_message(service, msg_id):
 
         # Extra safety: never react to sent/draft/spam/trash messages
         msg_labels = set(message.get('labelIds', []))
-        if any(l in msg_labels for l in ['SENT', 'DRAFT', 'SPAM', 'TRASH']):
+        if msg_labels & _EXCLUDED_LABELS:
             logger.info(f"Skipping message {msg_id} due to labels {msg_labels}")
             return
 
@@ -710,46 +854,216 @@ def process_message(service, msg_id):
             logger.info(f"Skipping old email {msg_id}")
             return
 
-        # Check if already replied
-        if has_auto_reply_label(service, msg_id):
+        # Check if already replied (reuse the fetched message, no extra get)
+        if has_auto_reply_label(service, msg_id, message=message):
             logger.info(f"Message {msg_id} already has auto-reply label, skipping")
             return
 
-        # Extract email data
-        logger.info("Extracting email data from message")
-        email_data = extract_email_data(message)
+        # Extract header data first; most rejected mail can be filtered without
+        # ever decoding the MIME body
+        logger.info("Extracting email headers from message")
+        email_data = extract_email_headers(message)
         logger.info(f"Extracted email from: {email_data.get('from', 'unknown')} to: {email_data.get('to', 'unknown')}")
 
-        # Check if email meets security criteria
+        # Check if email meets security criteria (header-only pass)
         is_allowed, reason = is_email_allowed(email_data)
         if not is_allowed:
             logger.info(f"Skipping email {msg_id}: {reason}")
             return
 
+        # Only now download/decode the body, then re-check the body-dependent
+        # filters (auto-reply indicators, spam keywords)
+        if metadata_only:
+            message = get_message(service, msg_id)
+            if not message:
+                logger.warning(f"Could not retrieve full message {msg_id}, skipping")
+                return
+        email_data['body'] = extract_email_body(message)
+        if email_data['body']:
+            is_allowed, reason = is_email_allowed(email_data)
+            if not is_allowed:
+                logger.info(f"Skipping email {msg_id}: {reason}")
+                return
+
         logger.info(f"Processing allowed email from {email_data.get('from')} to {email_data.get('to')}")
 
-        # Check if sender is a customer
-        sender_email = email_data.get('from', '').split('<')[-1].split('>')[0]
+        # Check if sender is a customer; parseaddr handles quoted display
+        # names and escaped brackets in one pass, unlike the old split chain
+        sender_email = parseaddr(email_data.get('from', ''))[1]
         is_nasabah, customer_info = get_customer_context(sender_email)
 
+        # Resolve the auto-reply label concurrently with the LLM call: the
+        # label RTT completes while the model is still generating. This
+        # thread does not touch service again until result() returns, so
+        # lending it to the label thread never overlaps with its owner.
+        label_future = _LABEL_EXECUTOR.submit(get_or_create_label_id, service)
+
         # Generate AI response with customer context
         logger.info("Generating AI response for email")
         response_text = generate_ai_response(email_data, is_nasabah, customer_info)
 
+        try:
+            label_id = label_future.result(timeout=30)
+        except Exception as e:
+            logger.warning(f"Could not pre-resolve auto-reply label: {e}")
+            label_id = None
+
         # Send reply
         logger.info("Sending auto-reply email")
-        send_reply(service, email_data, response_text)
+        send_reply(service, email_data, response_text, label_id=label_id)
         logger.info("Auto-reply sent successfully")
 
         # Add auto-reply label to prevent duplicate replies
         try:
-            add_auto_reply_label(service, msg_id)
+            add_auto_reply_label(service, msg_id, label_id=label_id)
         except Exception as e:
             logger.warning(f"Could not add auto-reply label: {e}")
     except Exception as e:
         logger.error(f"Error processing message {msg_id}: {e}", exc_info=True)
 
-def process_new_messages(service, history_id):
+GMAIL_BATCH_SIZE = 100  # Gmail batch endpoint caps at 100 operations per call
+
+# Headers needed to run every filter in is_email_allowed without the body
+_FILTER_METADATA_HEADERS = [
+    'From', 'To', 'Subject', 'Reply-To',
+    'Auto-Submitted', 'X-Auto-Response-Suppress',
+    'Precedence', 'X-AutoReply', 'X-AutoRespond',
+]
+
+def _batch_get_messages(service, msg_ids, format='metadata'):
+    """Fetch many messages via BatchHttpRequest instead of N round trips.
+
+    Defaults to metadata format (headers + labels only, 10-100x smaller than
+    full) since most candidates are filtered out before their body is needed.
+    Returns a dict of msg_id -> message; ids whose fetch failed are simply
+    absent so callers can skip them.
+    """
+    results = {}
+
+    def _store(request_id, response, exception):
+        if exception is not None:
+            logger.warning(f"Batch get failed for message {request_id}: {exception}")
+        else:
+            results[request_id] = response
+
+    for start in range(0, len(msg_ids), GMAIL_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=_store)
+        for mid in msg_ids[start:start + GMAIL_BATCH_SIZE]:
+            if format == 'metadata':
+                get_request = service.users().messages().get(
+                    userId='me', id=mid, format='metadata',
+                    metadataHeaders=_FILTER_METADATA_HEADERS)
+            else:
+                get_request = service.users().messages().get(
+                    userId='me', id=mid, format=format)
+            batch.add(get_request, request_id=mid)
+        batch.execute()
+    return results
+
+def _iter_eligible_ids(service, candidate_ids, processed_ids, require_unread_inbox=True):
+    """Yield (msg_id, message) for candidate messages that are eligible for auto-reply.
+
+    Shared by the main, fallback and backfill scan paths in process_new_messages:
+    batch-fetches all candidates (metadata only) in one or two round trips,
+    dedups via the caller-owned processed_ids set and applies the
+    incoming-message label filter once. The yielded message carries headers
+    and labels but no body; survivors fetch their body individually.
+    """
+    fresh_ids = []
+    seen = set()
+    for message_id in candidate_ids:
+        # Skip duplicates within the same delivery and across scan paths
+        if message_id in seen:
+            continue
+        if message_id in processed_ids:
+            logger.info(f"Skipping already processed message in this batch: {message_id}")
+            continue
+        seen.add(message_id)
+        fresh_ids.append(message_id)
+
+    messages = _batch_get_messages(service, fresh_ids)
+    for message_id in fresh_ids:
+        message = messages.get(message_id)
+        if message is None:
+            logger.warning(f"Could not fetch message {message_id} in batch. Skipping.")
+            continue
+
+        labels = set(message.get('labelIds', []))
+        # Process only real incoming unread messages in the inbox
+        if require_unread_inbox and not _REQUIRED_LABELS.issubset(labels):
+            logger.info(f"Skipping message {message_id} due to labels {labels} (needs INBOX+UNREAD)")
+            continue
+        # Never react to our own sent items or other non-incoming categories
+        if labels & _EXCLUDED_LABELS:
+            logger.info(f"Skipping non-incoming message {message_id} due to labels {labels}")
+            continue
+
+        processed_ids.add(message_id)
+        yield message_id, message
+
+def _added_message_ids(history_result):
+    """Collect unique message ids from messagesAdded records in a history.list response.
+
+    The same id routinely appears in several history records of one payload;
+    deduplicating here keeps every downstream fetch and reply single-shot.
+    Only messagesAdded entries are considered (not the broader `messages`
+    lists) so label-only changes never retrigger a reply.
+    """
+    ids = []
+    seen = set()
+    for history_record in history_result.get("history", []):
+        for message_added in history_record.get("messagesAdded", []):
+            mid = message_added["message"]["id"]
+            if mid not in seen:
+                seen.add(mid)
+                ids.append(mid)
+    return ids
+
+# Per-user cooldown for the backfill scan so high-frequency Pub/Sub pushes
+# don't trigger the O(10) metadata-get storm on every invocation.
+_LAST_BACKFILL = {}
+BACKFILL_MIN_INTERVAL_SECONDS = 60
+
+# Separate pool for per-message work (Vertex generation + Gmail send) so K
+# messages in one history push finish in ~T instead of ~K*T. Distinct from
+# the push-ack executor to avoid the two workloads starving each other.
+_MESSAGE_POOL = ThreadPoolExecutor(max_workers=int(os.environ.get('MAX_CONCURRENCY', '8')))
+
+def _process_message_on_worker(credentials, mid, message):
+    """process_message on the worker's own per-thread Gmail service.
+
+    Workers must not share the caller's transport (httplib2.Http is not
+    thread-safe), so each builds its own from the cached credentials on
+    first use and reuses it for later messages.
+    """
+    service = build_gmail_service(credentials)
+    process_message(service, mid, message=message, metadata_only=True)
+
+def _process_eligible(service, eligible, tag=''):
+    """Process (msg_id, message) pairs, concurrently when there are several.
+
+    Returns the number of messages handed to process_message. Exceptions are
+    handled inside process_message itself, so failures are logged per message
+    rather than aborting the batch.
+    """
+    if not eligible:
+        return 0
+    if len(eligible) == 1:
+        mid, message = eligible[0]
+        logger.info(f"{tag}Processing message: {mid}")
+        process_message(service, mid, message=message, metadata_only=True)
+        return 1
+    credentials = get_credentials_from_secret_manager()
+    futures = []
+    for mid, message in eligible:
+        logger.info(f"{tag}Processing message: {mid}")
+        futures.append(_MESSAGE_POOL.submit(
+            _process_message_on_worker, credentials, mid, message))
+    for future in futures:
+        future.result()
+    return len(eligible)
+
+def process_new_messages(service, history_id, email_address=None):
     """Process new messages based on history ID."""
     try:
         # Get new messages
@@ -758,7 +1072,8 @@ def process_new_messages(service, history_id):
                 userId="me",
                 startHistoryId=history_id
             ).execute()
-            logger.info(f"History result: {history_result}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("History result: %s", history_result)
         except HttpError as e:
             logger.error(f"HTTP Error getting history: {e.resp.status} - {e._get_reason()}")
             if e.resp.status == 404:
@@ -768,53 +1083,20 @@ def process_new_messages(service, history_id):
             logger.error(f"Unexpected error getting history: {e}", exc_info=True)
             return
 
-        # Process new messages
+        # Process new messages; a single dedup set is shared across all scan paths
+        processed_ids = set()
         found_added = False
+        processed_count = 0
         if "history" in history_result:
             logger.info(f"Found {len(history_result['history'])} history records")
-            processed_ids = set()
-            for i, history_record in enumerate(history_result["history"]):
-                logger.info(f"Processing history record {i+1}: {history_record}")
-
-                # Only act on messages explicitly added in this history event to avoid duplicates
-                if "messagesAdded" in history_record:
-                    found_added = True
-                    logger.info(f"Found {len(history_record['messagesAdded'])} messages added")
-                    for message_added in history_record["messagesAdded"]:
-                        message_id = message_added["message"]["id"]
-
-                        # Skip duplicates within the same delivery
-                        if message_id in processed_ids:
-                            logger.info(f"Skipping already processed message in this batch: {message_id}")
-                            continue
-
-                        # Fetch minimal metadata to decide eligibility by labels
-                        try:
-                            meta = service.users().messages().get(
-                                userId='me', id=message_id, format='metadata',
-                                metadataHeaders=['From', 'To', 'Subject']
-                            ).execute()
-                        except Exception as e:
-                            logger.warning(f"Could not fetch metadata for {message_id}: {e}. Skipping.")
-                            continue
-
-                        labels = set(meta.get('labelIds', []))
-                        # Process only real incoming unread messages in the inbox
-                        if 'INBOX' not in labels or 'UNREAD' not in labels:
-                            logger.info(f"Skipping message {message_id} due to labels {labels} (needs INBOX+UNREAD)")
-                            continue
-                        # Never react to our own sent items or other non-incoming categories
-                        if any(l in labels for l in ['SENT', 'DRAFT', 'SPAM', 'TRASH']):
-                            logger.info(f"Skipping non-incoming message {message_id} due to labels {labels}")
-                            continue
-
-                        processed_ids.add(message_id)
-                        logger.info(f"Processing added incoming unread message: {message_id}")
-                        process_message(service, message_id)
-
-                # Log if no messages found we care about
-                if "messagesAdded" not in history_record:
-                    logger.info(f"No messagesAdded found in history record {i+1}")
+            added_ids = _added_message_ids(history_result)
+            if added_ids:
+                found_added = True
+                logger.info(f"Found {len(added_ids)} messages added")
+                eligible = list(_iter_eligible_ids(service, added_ids, processed_ids))
+                processed_count += _process_eligible(service, eligible)
+            else:
+                logger.info("No messagesAdded found in history records")
         else:
             logger.info("No history records found")
 
@@ -826,30 +1108,10 @@ def process_new_messages(service, history_id):
                 history_result_2 = service.users().history().list(
                     userId='me', startHistoryId=adjusted_id
                 ).execute()
-                if "history" in history_result_2:
-                    processed_ids = set()
-                    for i, history_record in enumerate(history_result_2["history"]):
-                        if "messagesAdded" in history_record:
-                            for message_added in history_record["messagesAdded"]:
-                                message_id = message_added["message"]["id"]
-                                if message_id in processed_ids:
-                                    continue
-                                try:
-                                    meta = service.users().messages().get(
-                                        userId='me', id=message_id, format='metadata',
-                                        metadataHeaders=['From', 'To', 'Subject']
-                                    ).execute()
-                                except Exception as e:
-                                    logger.warning(f"Could not fetch metadata for {message_id}: {e}. Skipping.")
-                                    continue
-                                labels = set(meta.get('labelIds', []))
-                                if 'INBOX' not in labels or 'UNREAD' not in labels:
-                                    continue
-                                if any(l in labels for l in ['SENT', 'DRAFT', 'SPAM', 'TRASH']):
-                                    continue
-                                processed_ids.add(message_id)
-                                logger.info(f"[Fallback] Processing added incoming unread message: {message_id}")
-                                process_message(service, message_id)
+                fallback_ids = _added_message_ids(history_result_2)
+                if fallback_ids:
+                    eligible = list(_iter_eligible_ids(service, fallback_ids, processed_ids))
+                    processed_count += _process_eligible(service, eligible, tag='[Fallback] ')
                 else:
                     logger.info("[Fallback] No history records found on retry")
             except Exception as e:
@@ -857,29 +1119,31 @@ def process_new_messages(service, history_id):
 
         # Final backfill: If still nothing processed, scan a small batch of recent INBOX+UNREAD
         # to avoid missing legit new mail when history is empty (e.g., first run, watch resets).
-        if not found_added:
+        # Rate-limited per user so frequent pushes don't turn this into a quota storm.
+        if processed_count == 0:
+            now = time.time()
+            backfill_key = email_address or 'me'
+            last_backfill = _LAST_BACKFILL.get(backfill_key, 0)
+            if now - last_backfill < BACKFILL_MIN_INTERVAL_SECONDS:
+                logger.info(f"Skipping backfill for {backfill_key}: last run {now - last_backfill:.0f}s ago "
+                            f"(min interval {BACKFILL_MIN_INTERVAL_SECONDS}s)")
+                logger.info("Successfully processed new messages")
+                return
+            _LAST_BACKFILL[backfill_key] = now
             try:
-                logger.info("No messagesAdded after fallback; running backfill scan of recent INBOX+UNREAD (max 10)")
+                logger.info("No messages processed after fallback; running backfill scan of recent INBOX+UNREAD (max 10)")
+                # Let Gmail's search index pre-filter non-incoming categories
+                # server-side instead of re-checking labels per message here
                 recent_list = service.users().messages().list(
-                    userId='me', labelIds=['INBOX', 'UNREAD'], maxResults=10
+                    userId='me',
+                    q='in:inbox is:unread -in:sent -in:draft -in:spam -in:trash -from:me',
+                    maxResults=10
                 ).execute()
                 ids = [m['id'] for m in recent_list.get('messages', [])]
                 logger.info(f"Backfill found {len(ids)} candidate unread messages")
-                processed_backfill = 0
-                for mid in ids:
-                    try:
-                        meta = service.users().messages().get(
-                            userId='me', id=mid, format='metadata',
-                            metadataHeaders=['From', 'To', 'Subject']
-                        ).execute()
-                        labels = set(meta.get('labelIds', []))
-                        if any(l in labels for l in ['SENT', 'DRAFT', 'SPAM', 'TRASH']):
-                            continue
-                        logger.info(f"[Backfill] Processing unread message: {mid}")
-                        process_message(service, mid)
-                        processed_backfill += 1
-                    except Exception as e:
-                        logger.warning(f"Backfill skip {mid} due to error: {e}")
+                eligible = list(_iter_eligible_ids(service, ids, processed_ids,
+                                                   require_unread_inbox=False))
+                processed_backfill = _process_eligible(service, eligible, tag='[Backfill] ')
                 logger.info(f"Backfill processed {processed_backfill} messages")
             except Exception as e:
                 logger.warning(f"Backfill scan failed: {e}")
@@ -892,25 +1156,78 @@ def process_new_messages(service, history_id):
 
 TEST_MODE = os.environ.get('TEST_MODE', 'false').lower() == 'true'
 
+# Background worker pool so Pub/Sub pushes are acked immediately instead of
+# holding the request open for the Gmail + AI work. If processing ran past
+# the subscription's ack deadline, Pub/Sub would redeliver and we'd reply to
+# the same mail twice.
+_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.environ.get('WORKER_THREADS', '4')))
+
+# Recently seen (email_address, history_id) deliveries so redeliveries are
+# dropped without touching the Gmail API
+_SEEN_DELIVERIES = {}
+_SEEN_DELIVERIES_LOCK = threading.Lock()
+SEEN_DELIVERY_TTL_SECONDS = 3600
+SEEN_DELIVERY_MAX_ENTRIES = 1024
+
+def _mark_delivery_seen(email_address, history_id):
+    """Record a Pub/Sub delivery; return False if it was already seen recently."""
+    key = (email_address, str(history_id))
+    now = time.time()
+    with _SEEN_DELIVERIES_LOCK:
+        seen_at = _SEEN_DELIVERIES.get(key)
+        if seen_at is not None and now - seen_at < SEEN_DELIVERY_TTL_SECONDS:
+            return False
+        if len(_SEEN_DELIVERIES) >= SEEN_DELIVERY_MAX_ENTRIES:
+            cutoff = now - SEEN_DELIVERY_TTL_SECONDS
+            for k in [k for k, ts in _SEEN_DELIVERIES.items() if ts < cutoff]:
+                del _SEEN_DELIVERIES[k]
+            if len(_SEEN_DELIVERIES) >= SEEN_DELIVERY_MAX_ENTRIES:
+                _SEEN_DELIVERIES.clear()
+        _SEEN_DELIVERIES[key] = now
+    return True
+
+def _process_push_in_background(history_id, email_address):
+    """Worker-side half of process_pubsub_push, run after the push is acked.
+
+    Credential retrieval and service build live here too, so even a cold
+    cache can't block the push response.
+    """
+    try:
+        credentials = get_credentials_from_secret_manager()
+        service = build_gmail_service(credentials)
+        logger.info(f"[worker] Processing new messages with history ID {history_id}")
+        process_new_messages(service, history_id, email_address=email_address)
+        logger.info("[worker] Successfully processed new messages")
+    except RefreshError as e:
+        logger.error(f"[worker] Credentials refresh failed, invalidating cache: {e}", exc_info=True)
+        invalidate_cached_credentials()
+    except Exception as e:
+        logger.error(f"[worker] Error processing new messages: {e}", exc_info=True)
+
 @app.route('/process', methods=['POST'])
 def process_pubsub_push():
     """HTTP endpoint for Pub/Sub push messages."""
     logger.info("Received request to /process endpoint")
 
-    # Log request headers for debugging
-    try:
-        headers = dict(request.headers)
-        safe_headers = {k: v for k, v in headers.items() if 'auth' not in k.lower()}
-        logger.info(f"Request headers: {safe_headers}")
-    except Exception as e:
-        logger.error(f"Error processing request headers: {e}", exc_info=True)
+    # Log request headers for debugging; building and formatting the dict is
+    # only worth it when DEBUG is on
+    if logger.isEnabledFor(logging.DEBUG):
+        try:
+            headers = dict(request.headers)
+            safe_headers = {k: v for k, v in headers.items() if 'auth' not in k.lower()}
+            logger.debug("Request headers: %s", safe_headers)
+        except Exception as e:
+            logger.error(f"Error processing request headers: {e}", exc_info=True)
 
     # Get request data
     try:
-        envelope = request.get_json()
-        logger.info(f"Request payload type: {type(envelope)}")
-        # Log the actual payload for debugging
-        logger.info(f"Request payload: {json.dumps(envelope, indent=2) if envelope else 'None'}")
+        raw_body = request.get_data()
+        envelope = _json_loads(raw_body) if raw_body else None
+        logger.info("Request payload type: %s", type(envelope))
+        # Log the actual payload only when debugging; serializing it on every
+        # push is wasted CPU and logging ingress
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Request payload: {envelope}")
     except Exception as e:
         logger.error(f"Error parsing JSON: {e}", exc_info=True)
         return f'Error parsing JSON: {str(e)}', 400
@@ -920,7 +1237,7 @@ def process_pubsub_push():
         return 'No Pub/Sub message received', 400
 
     if not isinstance(envelope, dict) or 'message' not in envelope:
-        logger.error(f"Invalid Pub/Sub message format: {envelope}")
+        logger.error("Invalid Pub/Sub message format: %s", envelope)
         return 'Invalid Pub/Sub message format', 400
 
     message = envelope['message']
@@ -932,22 +1249,22 @@ def process_pubsub_push():
         return 'No data in message', 400
 
     try:
-        data = base64.b64decode(message['data']).decode('utf-8')
-        logger.info(f"Decoded message data: {data}")
+        data = base64.b64decode(message['data'])
+        logger.debug("Decoded message data: %s", data)
 
         # Parse the JSON data
-        json_data = json.loads(data)
-        logger.info(f"Parsed JSON data: {json_data}")
+        json_data = _json_loads(data)
+        logger.debug("Parsed JSON data: %s", json_data)
 
         # Extract email address and history ID
         email_address = json_data.get('emailAddress')
         history_id = json_data.get('historyId')
 
         if not email_address or not history_id:
-            logger.error(f"Missing email address or history ID in message data: {json_data}")
+            logger.error("Missing email address or history ID in message data: %s", json_data)
             return 'Missing email address or history ID', 400
 
-        logger.info(f"Processing message for {email_address} with history ID {history_id}")
+        logger.info("Processing message for %s with history ID %s", email_address, history_id)
 
         # If in test mode, return success without processing
         if TEST_MODE:
@@ -959,33 +1276,17 @@ def process_pubsub_push():
                 'history_id': history_id
             }), 200
 
-        # Get credentials from Secret Manager
-        try:
-            logger.info("Attempting to retrieve credentials from Secret Manager")
-            credentials = get_credentials_from_secret_manager()
-            logger.info("Successfully retrieved credentials from Secret Manager")
-        except Exception as e:
-            logger.error(f"Error getting credentials: {e}", exc_info=True)
-            return f'Error getting credentials: {str(e)}', 500
-
-        # Build Gmail API service
-        try:
-            logger.info("Building Gmail API service")
-            service = build('gmail', 'v1', credentials=credentials)
-            logger.info("Successfully built Gmail API service")
-        except Exception as e:
-            logger.error(f"Error building Gmail API service: {e}", exc_info=True)
-            return f'Error building Gmail API service: {str(e)}', 500
-
-        # Process new messages
-        try:
-            logger.info(f"Processing new messages with history ID {history_id}")
-            process_new_messages(service, history_id)
-            logger.info("Successfully processed new messages")
+        # Drop redeliveries of a history id we already accepted
+        if not _mark_delivery_seen(email_address, history_id):
+            logger.info("Duplicate delivery for %s history ID %s, acking without processing", email_address, history_id)
             return 'OK', 200
-        except Exception as e:
-            logger.error(f"Error processing new messages: {e}", exc_info=True)
-            return f'Error processing new messages: {str(e)}', 500
+
+        # Hand all remaining work (credentials, Gmail service, AI) to the
+        # background pool and ack immediately: the handler itself does no
+        # blocking RPC, so a request slot is held only for envelope parsing
+        logger.info("Queueing background processing for history ID %s", history_id)
+        _EXECUTOR.submit(_process_push_in_background, history_id, email_address)
+        return 'OK', 200
 
     except Exception as e:
         logger.error(f"Error decoding or processing message data: {e}", exc_info=True)
@@ -1004,7 +1305,7 @@ def check_watch_status():
 
         # Build Gmail API service
         logger.info("Building Gmail API service")
-        service = build('gmail', 'v1', credentials=credentials)
+        service = build_gmail_service(credentials)
 
         # Get profile to check if watch is active
         profile = service.users().getProfile(userId='me').execute()
@@ -1047,7 +1348,7 @@ def renew_watch():
 
         # Build Gmail API service
         logger.info("Building Gmail API service")
-        service = build('gmail', 'v1', credentials=credentials)
+        service = build_gmail_service(credentials)
 
         # Set up watch
         logger.info("Setting up Gmail API watch")
@@ -1101,7 +1402,7 @@ def test_pubsub():
 
         # Build Gmail API service
         logger.info("Building Gmail API service")
-        service = build('gmail', 'v1', credentials=credentials)
+        service = build_gmail_service(credentials)
 
         # Process the test message
         logger.info(f"Processing test message with history ID {test_data['historyId']}")
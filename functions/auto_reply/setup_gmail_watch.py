@@ -9,12 +9,26 @@ This script will:
 
 import os
 import json
+import sys
+import threading
+import time
+import google_auth_httplib2
+import httplib2
+from google.api_core.exceptions import AlreadyExists, NotFound
 from google.cloud import pubsub_v1
 from google.cloud.pubsub_v1.types import PushConfig
 from google.cloud import secretmanager
 from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
 
+# orjson parses the secret payload straight from bytes, skipping the
+# intermediate decode; the stdlib parser remains as fallback
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Configuration
 PROJECT_ID = "awanmasterpiece"
 TOPIC_NAME = "gmail-notifications"
@@ -22,37 +36,61 @@ SUBSCRIPTION_NAME = "gmail-notifications-sub"
 SECRET_NAME = "gmail-oauth-token"
 PUSH_ENDPOINT = "https://auto-reply-email-361046956504.us-central1.run.app/process"
 
-def get_credentials_from_secret_manager():
-    """Get Gmail API credentials from Secret Manager."""
-    client = secretmanager.SecretManagerServiceClient()
-    name = f"projects/{PROJECT_ID}/secrets/{SECRET_NAME}/versions/latest"
-    response = client.access_secret_version(request={"name": name})
-    token_data = json.loads(response.payload.data.decode("UTF-8"))
-    return Credentials.from_authorized_user_info(token_data)
+# TTL cache for secret fetches: repeat calls within the TTL return the parsed
+# Credentials instead of paying the ~300ms access_secret_version round trip
+_SECRET_CACHE = {}
+_SECRET_CACHE_LOCK = threading.Lock()
+_SECRET_TTL = 3600
 
-def create_pubsub_topic():
-    """Create Pub/Sub topic for Gmail notifications."""
-    publisher = pubsub_v1.PublisherClient()
+def get_credentials_from_secret_manager(version="latest"):
+    """Get Gmail API credentials from Secret Manager, cached per version."""
+    name = f"projects/{PROJECT_ID}/secrets/{SECRET_NAME}/versions/{version}"
+    now = time.monotonic()
+    with _SECRET_CACHE_LOCK:
+        entry = _SECRET_CACHE.get(name)
+        if entry is not None and now - entry[0] < _SECRET_TTL:
+            return entry[1]
+
+        client = secretmanager.SecretManagerServiceClient()
+        response = client.access_secret_version(request={"name": name})
+        token_data = _json_loads(response.payload.data)
+        credentials = Credentials.from_authorized_user_info(token_data)
+        _SECRET_CACHE[name] = (now, credentials)
+        return credentials
+
+def create_pubsub_topic(publisher):
+    """Create Pub/Sub topic for Gmail notifications (idempotent)."""
     topic_path = publisher.topic_path(PROJECT_ID, TOPIC_NAME)
-    
+
+    # On re-runs the topic usually exists, so check first and only create
+    # on NotFound; other errors propagate instead of being string-matched
+    try:
+        publisher.get_topic(request={"topic": topic_path})
+        print(f"Topic {topic_path} already exists")
+        return
+    except NotFound:
+        pass
+
     try:
         topic = publisher.create_topic(request={"name": topic_path})
         print(f"Created topic: {topic.name}")
-    except Exception as e:
-        if "already exists" in str(e).lower():
-            print(f"Topic {topic_path} already exists")
-        else:
-            print(f"Error creating topic: {e}")
-            raise
+    except AlreadyExists:
+        print(f"Topic {topic_path} already exists")
 
-def create_pubsub_subscription():
+def create_pubsub_subscription(subscriber):
     """Create Pub/Sub subscription with push endpoint."""
-    subscriber = pubsub_v1.SubscriberClient()
     topic_path = subscriber.topic_path(PROJECT_ID, TOPIC_NAME)
     subscription_path = subscriber.subscription_path(PROJECT_ID, SUBSCRIPTION_NAME)
     
     push_config = PushConfig(push_endpoint=PUSH_ENDPOINT)
-    
+
+    try:
+        subscriber.get_subscription(request={"subscription": subscription_path})
+        print(f"Subscription {subscription_path} already exists")
+        return
+    except NotFound:
+        pass
+
     try:
         subscription = subscriber.create_subscription(
             request={
@@ -62,17 +100,73 @@ def create_pubsub_subscription():
             }
         )
         print(f"Created subscription: {subscription.name}")
-    except Exception as e:
-        if "already exists" in str(e).lower():
-            print(f"Subscription {subscription_path} already exists")
-        else:
-            print(f"Error creating subscription: {e}")
-            raise
-
-def setup_gmail_watch():
-    """Setup Gmail watch to send notifications to Pub/Sub topic."""
+    except AlreadyExists:
+        print(f"Subscription {subscription_path} already exists")
+
+# One underlying httplib2 transport for all Gmail calls in this process
+_HTTP = None
+_HTTP_LOCK = threading.Lock()
+
+def _get_http():
+    """Return the shared httplib2 transport, creating it on first use."""
+    global _HTTP
+    if _HTTP is None:
+        with _HTTP_LOCK:
+            if _HTTP is None:
+                _HTTP = httplib2.Http(timeout=30)
+    return _HTTP
+
+# State file recording the last watch() result; the Gmail API offers no way
+# to read the current watch expiration back, so remember it between runs
+WATCH_STATE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.gmail_watch_state.json')
+# Renew only when less than 48h remain of the 7-day watch TTL
+WATCH_RENEW_THRESHOLD_MS = 48 * 3600 * 1000
+
+def _load_watch_state():
+    """Read the stored watch state, or an empty dict if absent/corrupt."""
+    try:
+        with open(WATCH_STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_watch_state(result):
+    """Persist the watch() result for the next re-run."""
+    try:
+        with open(WATCH_STATE_FILE, 'w') as f:
+            json.dump({
+                'historyId': result.get('historyId'),
+                'expiration': result.get('expiration'),
+            }, f)
+    except OSError as e:
+        print(f"Warning: could not save watch state: {e}")
+
+def setup_gmail_watch(force=False):
+    """Setup Gmail watch to send notifications to Pub/Sub topic.
+
+    With force=False, the watch() mutation is skipped when the previous
+    watch is still more than 48 hours from expiring.
+    """
+    if not force:
+        state = _load_watch_state()
+        try:
+            remaining_ms = int(state.get('expiration') or 0) - int(time.time() * 1000)
+        except (TypeError, ValueError):
+            remaining_ms = 0
+        if remaining_ms > WATCH_RENEW_THRESHOLD_MS:
+            print(f"Gmail watch still valid for {remaining_ms // 3600000}h, skipping renewal")
+            return state
+
     credentials = get_credentials_from_secret_manager()
-    service = build('gmail', 'v1', credentials=credentials)
+    # Shared keep-alive transport: repeat Gmail calls reuse the TCP/TLS
+    # connection instead of handshaking per execute(); static_discovery uses
+    # the discovery document bundled with the client library instead of
+    # fetching it over HTTPS on every run
+    authed_http = google_auth_httplib2.AuthorizedHttp(
+        credentials, http=_get_http())
+    service = build('gmail', 'v1', http=authed_http,
+                    static_discovery=True, cache_discovery=False)
     
     topic_name = f"projects/{PROJECT_ID}/topics/{TOPIC_NAME}"
     
@@ -87,27 +181,36 @@ def setup_gmail_watch():
         print(f"Gmail watch setup successful!")
         print(f"History ID: {result.get('historyId')}")
         print(f"Expiration: {result.get('expiration')}")
+        _save_watch_state(result)
         return result
     except Exception as e:
         print(f"Error setting up Gmail watch: {e}")
         raise
 
-def main():
+def main(force_watch=False):
     """Main function to setup Gmail auto-reply system."""
     print("Setting up Gmail Auto-Reply System...")
     print("=" * 50)
-    
-    # Step 1: Create Pub/Sub topic
-    print("1. Creating Pub/Sub topic...")
-    create_pubsub_topic()
-    
-    # Step 2: Create Pub/Sub subscription
-    print("2. Creating Pub/Sub subscription...")
-    create_pubsub_subscription()
-    
+
+    # Build the Pub/Sub clients once so both setup steps reuse the same
+    # gRPC channel instead of paying a TLS handshake per client
+    publisher = pubsub_v1.PublisherClient()
+    subscriber = pubsub_v1.SubscriberClient()
+
+    try:
+        # Step 1: Create Pub/Sub topic
+        print("1. Creating Pub/Sub topic...")
+        create_pubsub_topic(publisher)
+
+        # Step 2: Create Pub/Sub subscription
+        print("2. Creating Pub/Sub subscription...")
+        create_pubsub_subscription(subscriber)
+    finally:
+        subscriber.close()
+
     # Step 3: Setup Gmail watch
     print("3. Setting up Gmail watch...")
-    watch_result = setup_gmail_watch()
+    watch_result = setup_gmail_watch(force=force_watch)
     
     print("\n" + "=" * 50)
     print("✅ Gmail Auto-Reply System Setup Complete!")
@@ -123,4 +226,4 @@ def main():
     print("\n🧪 To test, send an email to: squidgamecs2025@gmail.com")
 
 if __name__ == "__main__":
-    main()
+    main(force_watch="--force" in sys.argv)
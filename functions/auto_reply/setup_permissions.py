@@ -3,8 +3,20 @@
 Script to setup permissions for Gmail API watch
 """
 
+import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from google.cloud import pubsub_v1
+
+PROJECT_ID = "awanmasterpiece"
+TOPIC_NAME = "gmail-notifications"
+ROLE = "roles/pubsub.publisher"
+MEMBERS = [
+    "serviceAccount:gmail-api-push@system.gserviceaccount.com",
+    f"serviceAccount:autoreply-sa@{PROJECT_ID}.iam.gserviceaccount.com",
+]
 
 def run_command(cmd):
     """Run a command and return the result."""
@@ -24,39 +36,84 @@ def run_command(cmd):
         print(f"❌ Exception: {e}")
         return False
 
+def grant_publisher(publisher, topic_path, members):
+    """Add publisher bindings for all members in one get/set IAM round trip."""
+    policy = publisher.get_iam_policy(request={"resource": topic_path})
+
+    binding = next((b for b in policy.bindings if b.role == ROLE), None)
+    if binding is None:
+        binding = policy.bindings.add()
+        binding.role = ROLE
+
+    added = [m for m in members if m not in binding.members]
+    if added:
+        binding.members.extend(added)
+        policy = publisher.set_iam_policy(
+            request={"resource": topic_path, "policy": policy}
+        )
+    return policy, added
+
+def main_gcloud():
+    """Fallback path that shells out to gcloud (--use-gcloud)."""
+    # The two bindings target different members on the same topic, so the
+    # gcloud calls can run side by side; each pays 1-3s of CLI startup
+    print("1. Adding service account permissions to Pub/Sub topic...")
+    cmds = [
+        f"gcloud pubsub topics add-iam-policy-binding {TOPIC_NAME} --member={member} --role={ROLE} --project={PROJECT_ID}"
+        for member in MEMBERS
+    ]
+    if os.name != "nt":
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            results = list(ex.map(run_command, cmds))
+    else:
+        results = [run_command(cmd) for cmd in cmds]
+
+    # Check topic permissions after both bindings have landed
+    print("\n2. Checking topic permissions...")
+    cmd = f"gcloud pubsub topics get-iam-policy {TOPIC_NAME} --project={PROJECT_ID}"
+    run_command(cmd)
+
+    return all(results)
+
 def main():
     """Setup permissions for Gmail API watch."""
     print("🔐 Setting up Gmail API Watch Permissions...")
     print("=" * 60)
-    
-    PROJECT_ID = "awanmasterpiece"
-    TOPIC_NAME = "gmail-notifications"
-    
-    # Add Gmail service account permission to publish to our topic
-    print("1. Adding Gmail API service account permission to Pub/Sub topic...")
-    cmd = f"gcloud pubsub topics add-iam-policy-binding {TOPIC_NAME} --member=serviceAccount:gmail-api-push@system.gserviceaccount.com --role=roles/pubsub.publisher --project={PROJECT_ID}"
-    success1 = run_command(cmd)
-    
-    # Also add our service account permission to the topic (just in case)
-    print("\n2. Adding our service account permission to Pub/Sub topic...")
-    cmd = f"gcloud pubsub topics add-iam-policy-binding {TOPIC_NAME} --member=serviceAccount:autoreply-sa@{PROJECT_ID}.iam.gserviceaccount.com --role=roles/pubsub.publisher --project={PROJECT_ID}"
-    success2 = run_command(cmd)
-    
-    # Check topic permissions
-    print("\n3. Checking topic permissions...")
-    cmd = f"gcloud pubsub topics get-iam-policy {TOPIC_NAME} --project={PROJECT_ID}"
-    success3 = run_command(cmd)
-    
+
+    if "--use-gcloud" in sys.argv:
+        success = main_gcloud()
+    else:
+        # In-process via the Pub/Sub client: both bindings land in a single
+        # get/set IAM pair instead of one gcloud cold start (~1-3s) per member
+        print(f"1. Granting {ROLE} on {TOPIC_NAME} to:")
+        for member in MEMBERS:
+            print(f"   - {member}")
+        try:
+            publisher = pubsub_v1.PublisherClient()
+            topic_path = publisher.topic_path(PROJECT_ID, TOPIC_NAME)
+            policy, added = grant_publisher(publisher, topic_path, MEMBERS)
+            if added:
+                print(f"✅ Added bindings for: {', '.join(added)}")
+            else:
+                print("✅ All bindings already present")
+            print("\n2. Current topic policy:")
+            for binding in policy.bindings:
+                print(f"   {binding.role}: {', '.join(binding.members)}")
+            success = True
+        except Exception as e:
+            print(f"❌ Error updating IAM policy: {e}")
+            success = False
+
     print("\n" + "=" * 60)
-    if success1:
+    if success:
         print("✅ Gmail API service account permission added successfully!")
         print("📝 Now you can try running: python setup_gmail_watch.py")
     else:
         print("❌ Failed to add Gmail API service account permission")
         print("💡 You may need to run this manually:")
         print(f"   gcloud pubsub topics add-iam-policy-binding {TOPIC_NAME} \\")
-        print(f"   --member=serviceAccount:gmail-api-push@system.gserviceaccount.com \\")
-        print(f"   --role=roles/pubsub.publisher --project={PROJECT_ID}")
+        print(f"   --member={MEMBERS[0]} \\")
+        print(f"   --role={ROLE} --project={PROJECT_ID}")
 
 if __name__ == "__main__":
     main()
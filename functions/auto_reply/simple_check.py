@@ -3,8 +3,10 @@
 Simple script to check Gmail auto-reply system components
 """
 
+import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 def run_command(cmd):
     """Run a command and return the result."""
@@ -16,13 +18,34 @@ def run_command(cmd):
     except Exception as e:
         return False, "", str(e)
 
+# The four checks are independent, so they can run concurrently; each gcloud
+# invocation alone pays 1-3s of CLI startup
+CHECKS = [
+    ("topics", "gcloud pubsub topics list --project=awanmasterpiece"),
+    ("subscriptions", "gcloud pubsub subscriptions list --project=awanmasterpiece"),
+    ("cloud_run", "gcloud run services describe auto-reply-email --region=us-central1 --project=awanmasterpiece --format='value(status.url)'"),
+    ("health", "curl -s https://auto-reply-email-361046956504.us-central1.run.app/ | grep -q 'healthy'"),
+]
+
+def run_checks():
+    """Run all checks, concurrently where the platform allows it."""
+    # Serial fallback for Windows or when explicitly requested
+    if sys.platform == "win32" or os.environ.get("GCLOUD_SERIAL") == "1":
+        return {label: run_command(cmd) for label, cmd in CHECKS}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = {label: executor.submit(run_command, cmd) for label, cmd in CHECKS}
+        return {label: future.result() for label, future in futures.items()}
+
 def main():
     print("🔍 Checking Gmail Auto-Reply System Components...")
     print("=" * 60)
-    
+
+    results = run_checks()
+
     # Check Pub/Sub topics
     print("1. Checking Pub/Sub Topics...")
-    success, stdout, stderr = run_command("gcloud pubsub topics list --project=awanmasterpiece")
+    success, stdout, stderr = results["topics"]
     if success:
         if "gmail-notifications" in stdout:
             print("   ✅ gmail-notifications topic exists")
@@ -34,10 +57,10 @@ def main():
                     print(f"      - {line.strip()}")
     else:
         print(f"   ❌ Error checking topics: {stderr}")
-    
+
     # Check Pub/Sub subscriptions
     print("\n2. Checking Pub/Sub Subscriptions...")
-    success, stdout, stderr = run_command("gcloud pubsub subscriptions list --project=awanmasterpiece")
+    success, stdout, stderr = results["subscriptions"]
     if success:
         if "gmail-notifications-sub" in stdout:
             print("   ✅ gmail-notifications-sub subscription exists")
@@ -49,23 +72,23 @@ def main():
                     print(f"      - {line.strip()}")
     else:
         print(f"   ❌ Error checking subscriptions: {stderr}")
-    
+
     # Check Cloud Run service
     print("\n3. Checking Cloud Run Service...")
-    success, stdout, stderr = run_command("gcloud run services describe auto-reply-email --region=us-central1 --project=awanmasterpiece --format='value(status.url)'")
+    success, stdout, stderr = results["cloud_run"]
     if success and stdout.strip():
         print(f"   ✅ Cloud Run service is running: {stdout.strip()}")
     else:
         print(f"   ❌ Error checking Cloud Run service: {stderr}")
-    
+
     # Check if service is healthy
     print("\n4. Checking Service Health...")
-    success, stdout, stderr = run_command("curl -s https://auto-reply-email-361046956504.us-central1.run.app/ | grep -q 'healthy'")
+    success, stdout, stderr = results["health"]
     if success:
         print("   ✅ Service is healthy")
     else:
         print("   ❌ Service health check failed")
-    
+
     print("\n" + "=" * 60)
     print("📝 Next Steps:")
     print("   If Pub/Sub components are missing, run:")
@@ -8,9 +8,23 @@ import json
 import base64
 import argparse
 
+# orjson serializes straight to bytes and is several times faster than the
+# stdlib encoder, which matters when this script is reused to generate load
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_dumps = lambda obj: json.dumps(obj).encode('utf-8')
+
+PROJECT_ID = "awanmasterpiece"
+TOPIC_NAME = "gmail-notifications"
+
 # Parse command line arguments
 parser = argparse.ArgumentParser()
 parser.add_argument("--url", default="http://localhost:9990/process", help="URL to send test request to")
+parser.add_argument("--mode", choices=["http", "pubsub"], default="http",
+                    help="http: POST the push envelope directly; pubsub: publish via the real topic")
+parser.add_argument("--count", type=int, default=1, help="Number of test messages to send")
 args = parser.parse_args()
 
 # Create test data
@@ -19,27 +33,55 @@ test_data = {
     "historyId": "12345678"
 }
 
-# Encode test data as base64
-encoded_data = base64.b64encode(json.dumps(test_data).encode('utf-8')).decode('utf-8')
-
-# Create Pub/Sub message envelope
-message = {
-    "message": {
-        "data": encoded_data,
-        "messageId": "test-message-id",
-        "publishTime": "2023-01-01T00:00:00.000Z"
-    },
-    "subscription": "projects/test-project/subscriptions/test-subscription"
-}
+def send_http(count):
+    """POST hand-built push envelopes straight to the Flask endpoint."""
+    # Encode test data as base64
+    encoded_data = base64.b64encode(_json_dumps(test_data)).decode('utf-8')
 
-# Send request to Flask application
-try:
-    response = requests.post(
-        args.url,
-        json=message,
-        headers={"Content-Type": "application/json"}
+    for i in range(count):
+        # Create Pub/Sub message envelope
+        message = {
+            "message": {
+                "data": encoded_data,
+                "messageId": f"test-message-{i + 1}",
+                "publishTime": "2023-01-01T00:00:00.000Z"
+            },
+            "subscription": "projects/test-project/subscriptions/test-subscription"
+        }
+
+        # Send request to Flask application
+        try:
+            response = requests.post(
+                args.url,
+                json=message,
+                headers={"Content-Type": "application/json"}
+            )
+            print(f"Status Code: {response.status_code}")
+            print(f"Response: {response.text}")
+        except Exception as e:
+            print(f"Error: {e}")
+
+def send_pubsub(count):
+    """Publish through the real topic: gRPC with client-side batching, and
+    Pub/Sub builds the push envelope itself (no manual base64 round trip)."""
+    from google.cloud import pubsub_v1
+    from google.cloud.pubsub_v1 import types as pubsub_types
+
+    publisher = pubsub_v1.PublisherClient(
+        batch_settings=pubsub_types.BatchSettings(max_messages=100, max_latency=0.05)
     )
-    print(f"Status Code: {response.status_code}")
-    print(f"Response: {response.text}")
-except Exception as e:
-    print(f"Error: {e}")
+    topic_path = publisher.topic_path(PROJECT_ID, TOPIC_NAME)
+
+    futures = [publisher.publish(topic_path, data=_json_dumps(test_data))
+               for _ in range(count)]
+    for future in futures:
+        try:
+            print(f"Published: {future.result(timeout=30)}")
+        except Exception as e:
+            print(f"Error publishing: {e}")
+
+if __name__ == "__main__":
+    if args.mode == "pubsub":
+        send_pubsub(args.count)
+    else:
+        send_http(args.count)
@@ -7,54 +7,76 @@ import json
 import base64
 import requests
 import sys
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson serializes straight to bytes, skipping the intermediate str that
+# json.dumps(...).encode() produces per envelope
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_dumps = lambda obj: json.dumps(obj).encode()
+
+# Cloud Run service URL
+SERVICE_URL = "https://auto-reply-email-361046956504.us-central1.run.app"
+
+# Pooled session so repeated test posts reuse the TLS connection; transient
+# 5xx responses from the service retry with a short backoff
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504]),
+))
+
+def send_messages(messages):
+    """POST a batch of simulated Pub/Sub envelopes over the shared session."""
+    responses = []
+    for i, message in enumerate(messages):
+        message_data = base64.b64encode(_json_dumps(message)).decode()
+        pubsub_message = {
+            "message": {
+                "data": message_data,
+                "messageId": f"test-message-{i + 1}",
+                "publishTime": "2024-01-20T10:00:00.000Z"
+            }
+        }
+        response = SESSION.post(
+            f"{SERVICE_URL}/process",
+            json=pubsub_message,
+            headers={"Content-Type": "application/json"},
+            timeout=30
+        )
+        responses.append(response)
+    return responses
 
 def test_direct_message():
     """Test the auto-reply system with a simulated Pub/Sub message."""
-    
-    # Cloud Run service URL
-    service_url = "https://auto-reply-email-361046956504.us-central1.run.app"
-    
+
     # Create a test Pub/Sub message
     # This simulates what Gmail sends when a new email arrives
     test_message = {
         "emailAddress": "squidgamecs2025@gmail.com",
         "historyId": "23137900"  # Use a recent history ID
     }
-    
-    # Encode the message as base64 (as Pub/Sub does)
-    message_data = base64.b64encode(json.dumps(test_message).encode()).decode()
-    
-    # Create the Pub/Sub push format
-    pubsub_message = {
-        "message": {
-            "data": message_data,
-            "messageId": "test-message-123",
-            "publishTime": "2024-01-20T10:00:00.000Z"
-        }
-    }
-    
-    print(f"Testing auto-reply system at: {service_url}/process")
+
+    print(f"Testing auto-reply system at: {SERVICE_URL}/process")
     print(f"Simulating message: {test_message}")
-    
+
     try:
         # Send the test message to our service
-        response = requests.post(
-            f"{service_url}/process",
-            json=pubsub_message,
-            headers={"Content-Type": "application/json"},
-            timeout=30
-        )
-        
+        response = send_messages([test_message])[0]
+
         print(f"Response status: {response.status_code}")
         print(f"Response text: {response.text}")
-        
+
         if response.status_code == 200:
             print("✅ Test message sent successfully!")
             print("Check the logs to see detailed processing information:")
             print("gcloud logging read \"resource.type=cloud_run_revision AND resource.labels.service_name=auto-reply-email\" --limit=20 --project=awanmasterpiece")
         else:
             print(f"❌ Test failed with status {response.status_code}")
-            
+
     except Exception as e:
         print(f"❌ Error sending test message: {e}")
 
@@ -3,10 +3,44 @@
 Test script using Google GenAI SDK instead of Vertex AI
 """
 
+import logging
 import os
 from google import genai
 from google.genai import types
 
+log = logging.getLogger(__name__)
+
+# The prompt, contents and generation config are constant for this test, so
+# build them once at module scope instead of per invocation
+TEST_PROMPT = """You are a helpful AI email assistant. Generate a polite and professional response to this email:
+
+From: test@example.com
+Subject: Testing auto-reply
+Message: Hello, this is a test email to check if the auto-reply system is working.
+
+Your response should:
+- Acknowledge their email
+- Be helpful and professional
+- Be concise (2-3 sentences)
+- End politely
+
+Response:"""
+
+CONTENTS = [
+    types.Content(
+        role="user",
+        parts=[
+            types.Part.from_text(text=TEST_PROMPT),
+        ],
+    ),
+]
+
+GEN_CONFIG = types.GenerateContentConfig(
+    thinking_config=types.ThinkingConfig(
+        thinking_budget=0,
+    ),
+)
+
 def test_genai():
     """Test Google GenAI SDK."""
     try:
@@ -26,57 +60,30 @@ def test_genai():
         client = genai.Client(api_key=api_key)
         
         model = "gemini-2.5-flash-lite"
-        
-        # Test prompt
-        test_prompt = """You are a helpful AI email assistant. Generate a polite and professional response to this email:
-
-From: test@example.com
-Subject: Testing auto-reply
-Message: Hello, this is a test email to check if the auto-reply system is working.
-
-Your response should:
-- Acknowledge their email
-- Be helpful and professional
-- Be concise (2-3 sentences)
-- End politely
 
-Response:"""
-        
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_text(text=test_prompt),
-                ],
-            ),
-        ]
-        
-        generate_content_config = types.GenerateContentConfig(
-            thinking_config=types.ThinkingConfig(
-                thinking_budget=0,
-            ),
-        )
-        
         print("Generating response...")
-        response_text = ""
-        
+        # Collect chunks in a list and join once; += on str re-copies the
+        # whole accumulated response for every chunk
+        parts = []
+
         for chunk in client.models.generate_content_stream(
             model=model,
-            contents=contents,
-            config=generate_content_config,
+            contents=CONTENTS,
+            config=GEN_CONFIG,
         ):
-            response_text += chunk.text
+            parts.append(chunk.text)
             print(chunk.text, end="")
-        
+
+        response_text = "".join(parts)
+
         print(f"\n\n✅ Success! Generated response:")
         print(f"'{response_text.strip()}'")
         
         return response_text.strip()
         
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception("GenAI call failed")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     test_genai()
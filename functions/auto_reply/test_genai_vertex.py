@@ -3,7 +3,9 @@
 Test script using GenAI SDK with Vertex AI backend
 """
 
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
 from main import generate_ai_response
 
 # Set environment variable for Project ID if not already set
@@ -24,49 +26,63 @@ def mock_check_is_nasabah(email):
         return False
 
 def run_test(email_from, subject, body):
-    """Simulates the auto-reply flow for a single email."""
-    print(f"\n--- Testing for: {email_from} ---")
-    
+    """Simulates the auto-reply flow for a single email.
+
+    Returns the case's report as a string so concurrent runs don't
+    interleave their output.
+    """
+    out = io.StringIO()
+    print(f"\n--- Testing for: {email_from} ---", file=out)
+
     email_data = {
         'from': email_from,
         'subject': subject,
         'body': body
     }
-    
+
     # 1. Check if the sender is a customer using our mock function
     is_nasabah = mock_check_is_nasabah(email_from)
-    print(f"Customer check result: {'Nasabah' if is_nasabah else 'Bukan Nasabah'}")
-     
+    print(f"Customer check result: {'Nasabah' if is_nasabah else 'Bukan Nasabah'}", file=out)
+
     # 2. Generate AI response with the context
-    print("Generating AI response...")
+    print("Generating AI response...", file=out)
     response = generate_ai_response(email_data, is_nasabah)
-    
+
     if response:
-        print("✅ Success! Generated response:")
-        print("-" * 20)
-        print(response)
-        print("-" * 20)
+        print("✅ Success! Generated response:", file=out)
+        print("-" * 20, file=out)
+        print(response, file=out)
+        print("-" * 20, file=out)
     else:
-        print("❌ Error: Failed to generate AI response.")
+        print("❌ Error: Failed to generate AI response.", file=out)
 
-if __name__ == "__main__":
+    return out.getvalue()
+
+# The three cases are independent LLM calls of seconds each, so run them
+# concurrently and print the buffered reports in order afterwards
+TEST_CASES = [
     # Test case 1: Email dari nasabah terdaftar
-    run_test(
+    dict(
         email_from='squidgamecs2025@outlook.co.id',
         subject='Pertanyaan tentang produk',
         body='Halo, saya ingin bertanya tentang detail produk terbaru Anda.'
-    )
-
+    ),
     # Test case 2: Email dari bukan nasabah
-    run_test(
+    dict(
         email_from='random.person@example.com',
         subject='Kerjasama',
         body='Selamat siang, kami ingin mengajukan proposal kerjasama.'
-    )
-    
+    ),
     # Test case 3: Email dari bukan nasabah dengan pertanyaan saldo
-    run_test(
+    dict(
         email_from='potential.customer@example.com',
         subject='Pertanyaan Saldo',
         body='Hi cs team, Apakah saya boleh tahu saldo saya saat ini ada berapa? Thank you'
-    )
+    ),
+]
+
+if __name__ == "__main__":
+    with ThreadPoolExecutor(max_workers=len(TEST_CASES)) as executor:
+        reports = executor.map(lambda case: run_test(**case), TEST_CASES)
+    for report in reports:
+        print(report, end="")
@@ -3,23 +3,42 @@
 Test script to debug Vertex AI integration
 """
 
+import functools
+import logging
 import os
-import vertexai
-from vertexai.generative_models import GenerativeModel
+
+log = logging.getLogger(__name__)
 
 # Configuration
 PROJECT_ID = "awanmasterpiece"
 VERTEX_MODEL = "gemini-1.5-flash"  # More commonly available
 
+@functools.lru_cache(maxsize=1)
+def _model():
+    """Init the SDK and build the model once; looped calls reuse both.
+
+    vertexai's import chain pulls in grpc and protobuf, so defer it until
+    a model is actually needed.
+    """
+    import vertexai
+    from vertexai.generative_models import GenerativeModel
+
+    vertexai.init(project=PROJECT_ID, location="us-central1")
+    model = GenerativeModel(VERTEX_MODEL)
+    # Prime the gRPC channel with a cheap call so the TLS/HTTP2 handshake
+    # isn't charged to the first timed generation
+    try:
+        model.count_tokens("x")
+    except Exception:
+        pass
+    return model
+
 def test_vertex_ai():
     """Test Vertex AI text generation."""
     try:
-        print("Initializing Vertex AI...")
-        vertexai.init(project=PROJECT_ID, location="us-central1")
-        
         print(f"Loading model: {VERTEX_MODEL}")
-        model = GenerativeModel(VERTEX_MODEL)
-        
+        model = _model()
+
         # Test prompt
         prompt = """You are a helpful AI email assistant. Generate a polite and professional response to this email:
 
@@ -50,10 +69,9 @@ Response:"""
         print(f"'{response.text.strip()}'")
         return response.text.strip()
         
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception("Vertex AI call failed")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     test_vertex_ai()
@@ -6,37 +6,44 @@ Deployment script for Auto Reply Email system
 """
 
 import argparse
+import functools
 import json
 import os
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+from google.api_core.exceptions import AlreadyExists
+from google.cloud import pubsub_v1
+
 
 def run_command(cmd, capture_output=True, exit_on_error=True):
-    """Run a shell command.
-    
+    """Run a command.
+
     Args:
-        cmd (str): Command to run
+        cmd (list or str): Command to run; argv lists are executed directly
+            without a shell, strings fall back to shell=True
         capture_output (bool): Whether to capture output
         exit_on_error (bool): Whether to exit on error
-        
+
     Returns:
         tuple: (success, output) where success is a boolean and output is the command output
     """
-    print(f"Running: {cmd}")
+    is_argv = isinstance(cmd, (list, tuple))
+    print(f"Running: {' '.join(cmd) if is_argv else cmd}")
     try:
         result = subprocess.run(
             cmd,
-            shell=True,
+            shell=not is_argv,
             capture_output=capture_output,
             text=True,
             check=False
         )
         
         if result.returncode != 0:
-            print(f"\033[1;31mError executing command: {cmd}\033[0m")
+            print(f"\033[1;31mError executing command: {' '.join(cmd) if is_argv else cmd}\033[0m")
             print(f"\033[1;31mError: {result.stderr}\033[0m")
             if exit_on_error:
                 sys.exit(1)
@@ -44,26 +51,76 @@ def run_command(cmd, capture_output=True, exit_on_error=True):
             
         return True, result.stdout if capture_output else None
     except Exception as e:
-        print(f"\033[1;31mException executing command: {cmd}\033[0m")
+        print(f"\033[1;31mException executing command: {' '.join(cmd) if is_argv else cmd}\033[0m")
         print(f"\033[1;31mError: {str(e)}\033[0m")
         if exit_on_error:
             sys.exit(1)
         return False, str(e)
 
 
+def run_commands_parallel(cmds, max_workers=8):
+    """Run independent shell commands concurrently, exiting on any failure.
+
+    Each gcloud spawn costs several hundred ms of startup before doing real
+    work, so independent calls complete in roughly the time of the slowest
+    one instead of their sum.
+
+    Args:
+        cmds (list): Commands to run
+        max_workers (int): Thread pool size
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(run_command, cmd, capture_output=True, exit_on_error=False): cmd
+            for cmd in cmds
+        }
+        for future in as_completed(futures):
+            success, output = future.result()
+            if not success:
+                print(f"\033[1;31mFailed: {futures[future]}\033[0m")
+                sys.exit(1)
+
+
+# Discovered project IDs persist here so later runs skip the ~600ms
+# gcloud config shell-out entirely
+_PROJECT_ID_CACHE_FILE = Path.home() / ".cache" / "areai" / "project_id"
+
+
+@functools.lru_cache(maxsize=1)
 def get_project_id():
     """Get GCP project ID.
-    
+
+    Checks the usual environment variables, then the on-disk cache, and only
+    shells out to gcloud as a last resort. The result is memoized for the
+    process and persisted for later runs.
+
     Returns:
         str: GCP project ID
     """
-    project_id = os.environ.get("GCP_PROJECT_ID")
+    for var in ("GCP_PROJECT_ID", "GOOGLE_CLOUD_PROJECT", "GOOGLE_PROJECT"):
+        project_id = os.environ.get(var)
+        if project_id:
+            return project_id
+
+    try:
+        cached = _PROJECT_ID_CACHE_FILE.read_text().strip()
+        if cached:
+            return cached
+    except OSError:
+        pass
+
+    success, output = run_command(["gcloud", "config", "get-value", "project"],
+                                  exit_on_error=False)
+    project_id = output.strip() if success and output else ""
     if not project_id:
-        try:
-            project_id = run_command("gcloud config get-value project").strip()
-        except Exception:
-            project_id = input("Enter your GCP project ID: ")
-    
+        project_id = input("Enter your GCP project ID: ")
+
+    try:
+        _PROJECT_ID_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _PROJECT_ID_CACHE_FILE.write_text(project_id + "\n")
+    except OSError:
+        pass
+
     return project_id
 
 
@@ -82,7 +139,7 @@ def enable_apis(project_id):
         "secretmanager.googleapis.com"
     ]
     
-    cmd = f"gcloud services enable {' '.join(apis)} --project={project_id}"
+    cmd = ["gcloud", "services", "enable", *apis, f"--project={project_id}"]
     run_command(cmd, capture_output=False)
     
     print("APIs enabled successfully")
@@ -102,17 +159,19 @@ def create_service_account(project_id, sa_name="autoreply-sa"):
     
     # Check if service account already exists
     try:
-        cmd = f"gcloud iam service-accounts describe {sa_name}@{project_id}.iam.gserviceaccount.com --project={project_id}"
+        cmd = ["gcloud", "iam", "service-accounts", "describe",
+               f"{sa_name}@{project_id}.iam.gserviceaccount.com",
+               f"--project={project_id}"]
         run_command(cmd)
         print(f"Service account {sa_name} already exists")
     except Exception:
         # Create service account
-        cmd = f"gcloud iam service-accounts create {sa_name} \
-            --description=\"Service Account for Auto Reply Email with AI\" \
-            --display-name=\"Auto Reply Email SA\" \
-            --project={project_id}"
+        cmd = ["gcloud", "iam", "service-accounts", "create", sa_name,
+               "--description=Service Account for Auto Reply Email with AI",
+               "--display-name=Auto Reply Email SA",
+               f"--project={project_id}"]
         run_command(cmd, capture_output=False)
-    
+
     # Grant required roles
     roles = [
         "roles/pubsub.subscriber",
@@ -121,39 +180,63 @@ def create_service_account(project_id, sa_name="autoreply-sa"):
         "roles/secretmanager.secretAccessor"
     ]
     
-    for role in roles:
-        cmd = f"gcloud projects add-iam-policy-binding {project_id} \
-            --member=\"serviceAccount:{sa_name}@{project_id}.iam.gserviceaccount.com\" \
-            --role=\"{role}\""
-        run_command(cmd, capture_output=False)
-    
+    # Independent role grants; issue them concurrently
+    cmds = [
+        ["gcloud", "projects", "add-iam-policy-binding", project_id,
+         f"--member=serviceAccount:{sa_name}@{project_id}.iam.gserviceaccount.com",
+         f"--role={role}"]
+        for role in roles
+    ]
+    run_commands_parallel(cmds)
+
     print("Service account created and roles assigned")
     return f"{sa_name}@{project_id}.iam.gserviceaccount.com"
 
 
+@functools.lru_cache(maxsize=1)
+def _publisher():
+    """Shared Pub/Sub publisher client (one gRPC channel per process)."""
+    return pubsub_v1.PublisherClient()
+
+
+@functools.lru_cache(maxsize=1)
+def _subscriber():
+    """Shared Pub/Sub subscriber client (one gRPC channel per process)."""
+    return pubsub_v1.SubscriberClient()
+
+
 def setup_pubsub(project_id, topic_name="new-email"):
     """Set up Pub/Sub topic and subscription.
-    
+
+    Uses the Python client instead of gcloud: no CLI startup per call, and
+    AlreadyExists makes re-runs genuinely idempotent (the old try/except
+    around run_command never fired because run_command exits on error).
+
     Args:
         project_id (str): GCP project ID
         topic_name (str): Pub/Sub topic name
     """
     print(f"Setting up Pub/Sub topic: {topic_name}")
-    
+
     # Create topic
+    publisher = _publisher()
+    topic_path = publisher.topic_path(project_id, topic_name)
     try:
-        cmd = f"gcloud pubsub topics create {topic_name} --project={project_id}"
-        run_command(cmd, capture_output=False)
-    except Exception:
+        publisher.create_topic(request={"name": topic_path})
+        print(f"Created topic {topic_name}")
+    except AlreadyExists:
         print(f"Topic {topic_name} already exists")
-    
+
     # Create subscription
+    subscriber = _subscriber()
+    subscription_path = subscriber.subscription_path(project_id, "email-subscriber")
     try:
-        cmd = f"gcloud pubsub subscriptions create email-subscriber --topic={topic_name} --project={project_id}"
-        run_command(cmd, capture_output=False)
-    except Exception:
+        subscriber.create_subscription(
+            request={"name": subscription_path, "topic": topic_path})
+        print("Created subscription email-subscriber")
+    except AlreadyExists:
         print("Subscription email-subscriber already exists")
-    
+
     print("Pub/Sub setup completed")
 
 
@@ -169,14 +252,15 @@ def setup_secrets(project_id):
         "gmail-oauth-token",
         "customer-api-key"
     ]
-    
-    for secret in secrets:
-        try:
-            cmd = f"gcloud secrets create {secret} --replication-policy=\"automatic\" --project={project_id}"
-            run_command(cmd, capture_output=False)
-        except Exception:
-            print(f"Secret {secret} already exists")
-    
+
+    # The secret creations are independent of each other
+    cmds = [
+        ["gcloud", "secrets", "create", secret,
+         "--replication-policy=automatic", f"--project={project_id}"]
+        for secret in secrets
+    ]
+    run_commands_parallel(cmds)
+
     print("Secret Manager setup completed")
 
 
@@ -191,18 +275,18 @@ def deploy_cloud_function(project_id, region, sa_email, function_path):
     """
     print("Deploying Cloud Function...")
     
-    cmd = f"gcloud functions deploy auto-reply-email \
-        --runtime python311 \
-        --trigger-topic new-email \
-        --entry-point pubsub_trigger \
-        --service-account {sa_email} \
-        --region {region} \
-        --memory 256MB \
-        --timeout 60s \
-        --source {function_path} \
-        --set-env-vars GCP_PROJECT_ID={project_id},GCP_REGION={region} \
-        --project={project_id}"
-    
+    cmd = ["gcloud", "functions", "deploy", "auto-reply-email",
+           "--runtime=python311",
+           "--trigger-topic=new-email",
+           "--entry-point=pubsub_trigger",
+           f"--service-account={sa_email}",
+           f"--region={region}",
+           "--memory=256MB",
+           "--timeout=60s",
+           f"--source={function_path}",
+           f"--set-env-vars=GCP_PROJECT_ID={project_id},GCP_REGION={region}",
+           f"--project={project_id}"]
+
     run_command(cmd, capture_output=False)
     
     print("Cloud Function deployed successfully")
@@ -216,7 +300,7 @@ def setup_oauth(script_path):
     """
     print("Setting up OAuth for Gmail API")
     
-    cmd = f"python {script_path}"
+    cmd = [sys.executable, str(script_path)]
     run_command(cmd, capture_output=False)
     
     print("OAuth setup completed")
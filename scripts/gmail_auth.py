@@ -12,13 +12,16 @@ Usage:
 """
 
 import argparse
+import functools
 import json
 import os
+import re
 import sys
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from google.api_core.exceptions import AlreadyExists
 from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.cloud import secretmanager
@@ -27,6 +30,16 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+# orjson parses the token bytes directly and noticeably faster; stdlib json
+# remains as fallback
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj).encode('utf-8')
+
 # Constants
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.readonly',
@@ -38,6 +51,36 @@ DEFAULT_TOKEN_FILE = 'token.json'
 SECRET_NAME = 'gmail-oauth-token'
 
 
+def _token_bytes(creds):
+    """Serialize credentials to token-file bytes.
+
+    Builds the dict straight from the credential attributes instead of
+    round-tripping creds.to_json() through a second parse.
+    """
+    info = {
+        'token': creds.token,
+        'refresh_token': creds.refresh_token,
+        'token_uri': creds.token_uri,
+        'client_id': creds.client_id,
+        'client_secret': creds.client_secret,
+        'scopes': creds.scopes,
+    }
+    if creds.expiry:
+        info['expiry'] = creds.expiry.isoformat() + 'Z'
+    return _json_dumps(info)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_token(token_file, mtime_ns):
+    """Parse the token file into Credentials once per (path, mtime).
+
+    The mtime key invalidates the cache automatically when the file is
+    rewritten; unchanged tokens are never re-parsed within a process.
+    """
+    with open(token_file, 'rb') as f:
+        return Credentials.from_authorized_user_info(_json_loads(f.read()))
+
+
 def authenticate_gmail(credentials_file, token_file):
     """Authenticate with Gmail API using OAuth 2.0.
     
@@ -57,15 +100,31 @@ def authenticate_gmail(credentials_file, token_file):
     # Check if token file exists
     if os.path.exists(token_file):
         try:
-            with open(token_file, 'r') as token:
-                token_data = json.load(token)
-                creds = Credentials.from_authorized_user_info(token_data)
-                print(f"Loaded existing token for account: {token_data.get('client_id', 'unknown')}")
-        except (json.JSONDecodeError, KeyError) as e:
+            creds = _load_token(token_file, os.stat(token_file).st_mtime_ns)
+            print(f"Loaded existing token for account: {creds.client_id or 'unknown'}")
+        except (ValueError, KeyError) as e:
             print(f"Error loading token file: {e}")
             print("Will create a new token.")
             creds = None
-    
+
+    # Fast path: a still-valid token needs no prompts and no port probing.
+    # Refresh proactively when under 5 minutes remain so the watch/API calls
+    # that follow never hit an expired token mid-run.
+    if creds and creds.valid:
+        about_to_expire = (
+            creds.expiry and
+            (creds.expiry - datetime.utcnow()).total_seconds() < 300
+        )
+        if about_to_expire and creds.refresh_token:
+            try:
+                creds.refresh(Request())
+                print("Token refreshed proactively before expiry.")
+            except RefreshError as e:
+                # Still valid for now; the expired-token branch below will
+                # handle it on the next run
+                print(f"Proactive refresh failed: {e}")
+        return creds
+
     # If credentials exist but are expired, refresh them
     if creds and creds.expired and creds.refresh_token:
         try:
@@ -99,17 +158,13 @@ def authenticate_gmail(credentials_file, token_file):
             sys.exit(0)
         
         try:
-            # Check if port 8080 is already in use
+            # Check if port 4443 is already in use; connect_ex succeeding
+            # means something is listening there
             import socket
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            port_available = True
-            try:
-                sock.bind(('localhost', 4443))
-            except socket.error:
-                port_available = False
-            finally:
-                sock.close()
-            
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.settimeout(1)
+                port_available = sock.connect_ex(('localhost', 4443)) != 0
+
             if not port_available:
                 print("\nWARNING: Port 4443 is already in use!")
                 print("Please free up port 4443 by stopping any services using it and try again.")
@@ -138,8 +193,8 @@ def authenticate_gmail(credentials_file, token_file):
             if token_dir and not os.path.exists(token_dir):
                 os.makedirs(token_dir)
                 
-            with open(token_file, 'w') as token:
-                token.write(creds.to_json())
+            with open(token_file, 'wb') as token:
+                token.write(_token_bytes(creds))
                 print(f"\nToken saved to {token_file}")
                 
         except Exception as e:
@@ -149,22 +204,39 @@ def authenticate_gmail(credentials_file, token_file):
     return creds
 
 
+# Built Gmail services keyed by credential identity; building one parses the
+# whole discovery document, so renewals with the same creds reuse it
+_gmail_service_by_credential = {}
+
+
+def _gmail_service(creds):
+    """Return a Gmail service for these credentials, building it once."""
+    service = _gmail_service_by_credential.get(id(creds))
+    if service is None:
+        # static_discovery uses the discovery doc bundled with the client
+        # library instead of downloading it
+        service = build('gmail', 'v1', credentials=creds,
+                        static_discovery=True, cache_discovery=False)
+        _gmail_service_by_credential[id(creds)] = service
+    return service
+
+
 def setup_gmail_watch(creds, topic_name):
     """Set up Gmail API watch for new emails.
-    
+
     Args:
         creds: OAuth 2.0 credentials
         topic_name (str): Pub/Sub topic name
-        
+
     Returns:
         dict: Watch response with expiration and historyId
-        
+
     Raises:
         HttpError: If the API request fails
     """
     try:
-        service = build('gmail', 'v1', credentials=creds)
-        
+        service = _gmail_service(creds)
+
         request = {
             'labelIds': ['INBOX'],
             'topicName': topic_name
@@ -195,54 +267,62 @@ def setup_gmail_watch(creds, topic_name):
         raise
 
 
+@functools.lru_cache(maxsize=1)
+def _sm_client():
+    """Shared Secret Manager client; instantiation runs ADC discovery once."""
+    return secretmanager.SecretManagerServiceClient()
+
+
+# Secrets already ensured this process, keyed by (project_id, secret_name),
+# so repeat saves go straight to add_secret_version
+_secret_exists = {}
+
+
 def save_to_secret_manager(project_id, token_file):
     """Save token to Secret Manager.
-    
+
     Args:
         project_id (str): GCP project ID
         token_file (str): Path to OAuth token file
-        
+
     Returns:
         bool: True if successful, False otherwise
     """
     if not os.path.exists(token_file):
         print(f"Error: {token_file} not found.")
         return False
-    
+
     try:
-        # Create Secret Manager client
-        client = secretmanager.SecretManagerServiceClient()
+        client = _sm_client()
         parent = f"projects/{project_id}"
-        
-        # Check if secret already exists
-        try:
-            client.get_secret(request={"name": f"{parent}/secrets/{SECRET_NAME}"})
-            secret_exists = True
-            print(f"Secret {SECRET_NAME} already exists.")
-        except Exception:
-            secret_exists = False
-        
-        # Create secret if it doesn't exist
-        if not secret_exists:
-            print(f"Creating secret {SECRET_NAME}...")
-            client.create_secret(
-                request={
-                    "parent": parent,
-                    "secret_id": SECRET_NAME,
-                    "secret": {"replication": {"automatic": {}}}
-                }
-            )
-        
-        # Read token file
-        with open(token_file, 'r') as f:
-            token_data = f.read()
-        
+
+        # Create straight away and treat AlreadyExists as success; a
+        # get_secret probe would be an extra round trip and racy anyway
+        if not _secret_exists.get((project_id, SECRET_NAME)):
+            try:
+                client.create_secret(
+                    request={
+                        "parent": parent,
+                        "secret_id": SECRET_NAME,
+                        "secret": {"replication": {"automatic": {}}}
+                    }
+                )
+                print(f"Created secret {SECRET_NAME}.")
+            except AlreadyExists:
+                print(f"Secret {SECRET_NAME} already exists.")
+            _secret_exists[(project_id, SECRET_NAME)] = True
+
+        # Read token file as bytes; the API wants bytes anyway, so decoding
+        # to str and re-encoding would just copy the payload twice
+        with open(token_file, 'rb') as f:
+            payload_bytes = f.read()
+
         # Add new secret version
         secret_path = f"{parent}/secrets/{SECRET_NAME}"
         response = client.add_secret_version(
             request={
                 "parent": secret_path,
-                "payload": {"data": token_data.encode("UTF-8")}
+                "payload": {"data": payload_bytes}
             }
         )
         
@@ -292,26 +372,29 @@ def parse_arguments():
     return parser.parse_args()
 
 
+# Compiled once; a single C-level scan replaces the split/compare dance
+_TOPIC_RE = re.compile(r'projects/([^/]+)/topics/([^/]+)')
+
+
 def validate_topic_name(topic_name, project_id):
     """Validate Pub/Sub topic name format.
-    
+
     Args:
         topic_name (str): Topic name to validate
         project_id (str): GCP project ID
-        
+
     Returns:
         str: Validated topic name
     """
     if not topic_name.startswith("projects/"):
         # Add project prefix if not present
         topic_name = f"projects/{project_id}/topics/{topic_name}"
-    
+
     # Validate format
-    parts = topic_name.split('/')
-    if len(parts) != 4 or parts[0] != "projects" or parts[2] != "topics":
+    if not _TOPIC_RE.fullmatch(topic_name):
         print("Invalid topic name format. Expected: projects/{project_id}/topics/{topic}")
         return None
-    
+
     return topic_name
 
 
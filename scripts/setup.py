@@ -15,11 +15,17 @@ Usage:
     python setup.py [--install-deps] [--check-only] [--verbose]
 """
 
-import argparse
+import functools
+import importlib.metadata
+import json
 import os
-import platform
+import re
+import string
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 
 
@@ -33,6 +39,7 @@ REQUIRED_PACKAGES = [
     "google-cloud-logging",
     "google-cloud-secretmanager",
     "google-cloud-aiplatform",
+    "google-cloud-monitoring",
     "requests",
     "python-dateutil"
 ]
@@ -50,78 +57,111 @@ CONFIG_TEMPLATE = """
 # Auto Reply Email System Configuration
 
 # Google Cloud Project Settings
-PROJECT_ID={project_id}
-REGION={region}
+PROJECT_ID=${project_id}
+REGION=${region}
 
 # Gmail API Settings
-GMAIL_PUBSUB_TOPIC={pubsub_topic}
-GMAIL_OAUTH_SECRET={oauth_secret}
+GMAIL_PUBSUB_TOPIC=${pubsub_topic}
+GMAIL_OAUTH_SECRET=${oauth_secret}
 
 # Cloud Function Settings
-FUNCTION_NAME={function_name}
-FUNCTION_TIMEOUT={function_timeout}
-FUNCTION_MEMORY={function_memory}
+FUNCTION_NAME=${function_name}
+FUNCTION_TIMEOUT=${function_timeout}
+FUNCTION_MEMORY=${function_memory}
 
 # Vertex AI Settings
-VERTEX_AI_MODEL={vertex_ai_model}
-RESPONSE_TIMEOUT={response_timeout}
+VERTEX_AI_MODEL=${vertex_ai_model}
+RESPONSE_TIMEOUT=${response_timeout}
 
 # Customer API Settings
-CUSTOMER_API_ENDPOINT={customer_api_endpoint}
-CUSTOMER_API_KEY={customer_api_key}
+CUSTOMER_API_ENDPOINT=${customer_api_endpoint}
+CUSTOMER_API_KEY=${customer_api_key}
 
 # Logging Settings
-LOG_LEVEL={log_level}
+LOG_LEVEL=${log_level}
 
 # Feature Flags
-ENABLE_MOCK_CUSTOMER_API={enable_mock_customer_api}
-ENABLE_FALLBACK_RESPONSES={enable_fallback_responses}
+ENABLE_MOCK_CUSTOMER_API=${enable_mock_customer_api}
+ENABLE_FALLBACK_RESPONSES=${enable_fallback_responses}
 """
 
+# Parsed once at import; substitute() then skips the template scan that
+# str.format repeats on every call
+_CONFIG_TEMPLATE = string.Template(CONFIG_TEMPLATE)
+
+# Step 7 configuration schema: (key, prompt, default). Each key is also
+# exposed as a --key-with-dashes flag and as a key in the --config file,
+# so scripted runs never block on stdin.
+CONFIG_FIELDS = [
+    ("region", "Enter GCP region", "us-central1"),
+    ("pubsub_topic", "Enter Pub/Sub topic name", "gmail-notifications"),
+    ("oauth_secret", "Enter OAuth secret name", "gmail-oauth-token"),
+    ("function_name", "Enter Cloud Function name", "process-email"),
+    ("function_timeout", "Enter Cloud Function timeout in seconds", "60"),
+    ("function_memory", "Enter Cloud Function memory in MB", "256"),
+    ("vertex_ai_model", "Enter Vertex AI model name", "gemini-1.0-pro"),
+    ("response_timeout", "Enter response timeout in seconds", "15"),
+    ("customer_api_endpoint", "Enter Customer API endpoint", "https://example.com/api/v1/customers"),
+    ("customer_api_key", "Enter Customer API key (leave blank for none)", ""),
+    ("log_level", "Enter log level", "INFO"),
+    ("enable_mock_customer_api", "Enable mock Customer API for testing? (true/false)", "true"),
+    ("enable_fallback_responses", "Enable fallback responses? (true/false)", "true"),
+]
+
+
+# Color only when attached to a terminal; CI logs stay free of escape bytes
+_IS_TTY = sys.stdout.isatty()
+_BLUE = "\033[1;34m" if _IS_TTY else ""
+_GREEN = "\033[1;32m" if _IS_TTY else ""
+_RED = "\033[1;31m" if _IS_TTY else ""
+_YELLOW = "\033[1;33m" if _IS_TTY else ""
+_CYAN = "\033[1;36m" if _IS_TTY else ""
+_RESET = "\033[0m" if _IS_TTY else ""
+
 
 def print_step(step: str) -> None:
     """Print a setup step with formatting.
-    
+
     Args:
         step: Step description
     """
-    print(f"\n\033[1;34m=== {step} ===\033[0m")
+    sys.stdout.write("\n" + _BLUE + "=== " + step + " ===" + _RESET + "\n")
 
 
 def print_success(message: str) -> None:
     """Print a success message with formatting.
-    
+
     Args:
         message: Success message
     """
-    print(f"\033[1;32m✓ {message}\033[0m")
+    sys.stdout.write(_GREEN + "✓ " + message + _RESET + "\n")
 
 
 def print_error(message: str) -> None:
     """Print an error message with formatting.
-    
+
     Args:
         message: Error message
     """
-    print(f"\033[1;31m✗ {message}\033[0m")
+    sys.stdout.write(_RED + "✗ " + message + _RESET + "\n")
 
 
 def print_warning(message: str) -> None:
     """Print a warning message with formatting.
-    
+
     Args:
         message: Warning message
     """
-    print(f"\033[1;33m! {message}\033[0m")
+    sys.stdout.write(_YELLOW + "! " + message + _RESET + "\n")
 
 
 def print_info(message: str) -> None:
     """Print an info message with formatting.
-    
+
     Args:
         message: Info message
     """
-    print(f"\033[1;36m> {message}\033[0m")
+    sys.stdout.write(_CYAN + "> " + message + _RESET + "\n")
 
 
 def check_python_version() -> bool:
@@ -130,33 +170,46 @@ def check_python_version() -> bool:
     Returns:
         bool: True if Python version is compatible, False otherwise
     """
-    major, minor, _ = platform.python_version_tuple()
-    version_ok = int(major) >= 3 and int(minor) >= 7
-    
+    # sys.version_info is already a parsed tuple; no platform import or
+    # string parsing needed
+    version_ok = sys.version_info >= (3, 7)
+    version = ".".join(map(str, sys.version_info[:3]))
+
     if version_ok:
-        print_success(f"Python version {platform.python_version()} is compatible")
+        print_success(f"Python version {version} is compatible")
     else:
-        print_error(f"Python version {platform.python_version()} is not compatible (3.7+ required)")
-    
+        print_error(f"Python version {version} is not compatible (3.7+ required)")
+
     return version_ok
 
 
 def check_installed_packages() -> Tuple[List[str], List[str]]:
     """Check which required packages are installed.
-    
+
+    Reads the installed distributions once via importlib.metadata instead of
+    __import__-ing each package, which actually loaded every library (the
+    google-cloud ones take seconds) and mis-mapped distribution names like
+    google-api-python-client to nonexistent module names.
+
     Returns:
         Tuple[List[str], List[str]]: Lists of installed and missing packages
     """
+    installed_names = {
+        (dist.metadata["Name"] or "").lower()
+        for dist in importlib.metadata.distributions()
+    }
+
     installed = []
     missing = []
-    
+
     for package in REQUIRED_PACKAGES:
-        try:
-            __import__(package.replace("-", "_").split(">=")[0])
+        # Strip any version specifier to get the distribution name
+        name = re.split(r"[><=!~\[]", package, 1)[0].strip().lower()
+        if name in installed_names:
             installed.append(package)
-        except ImportError:
+        else:
             missing.append(package)
-    
+
     return installed, missing
 
 
@@ -172,22 +225,181 @@ def install_packages(packages: List[str], verbose: bool = False) -> bool:
     """
     if not packages:
         return True
-    
+
     print_info(f"Installing {len(packages)} missing packages...")
-    
-    cmd = [sys.executable, "-m", "pip", "install"] + packages
-    
+
+    # DEVNULL rather than PIPE: the output is never read, so don't make the
+    # kernel and Python buffer a noisy pip install just to throw it away
+    output_kwargs = {} if verbose else {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+
     try:
-        if verbose:
-            subprocess.run(cmd, check=True)
+        # Pip downloads wheels sequentially; on a cold cache the heavy
+        # google-cloud wheels dominate, so pre-fetch them concurrently and
+        # then install from the local directory in one pass
+        if len(packages) > 1:
+            import tempfile
+
+            with tempfile.TemporaryDirectory(prefix="areai-wheels-") as wheel_dir:
+                with ThreadPoolExecutor(max_workers=min(8, len(packages))) as executor:
+                    futures = {
+                        executor.submit(
+                            subprocess.run,
+                            [sys.executable, "-m", "pip", "download", "-d", wheel_dir, pkg],
+                            check=True, **output_kwargs
+                        ): pkg
+                        for pkg in packages
+                    }
+                    for i, future in enumerate(as_completed(futures), 1):
+                        future.result()
+                        print_info(f"[{i}/{len(packages)}] Downloaded {futures[future]}")
+
+                cmd = [sys.executable, "-m", "pip", "install",
+                       "--no-index", "--find-links", wheel_dir] + packages
+                subprocess.run(cmd, check=True, **output_kwargs)
         else:
-            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
+            cmd = [sys.executable, "-m", "pip", "install"] + packages
+            subprocess.run(cmd, check=True, **output_kwargs)
+
         print_success("Package installation completed")
         return True
     except subprocess.CalledProcessError as e:
-        print_error(f"Failed to install packages: {e}")
-        return False
+        # Fall back to the plain sequential install; pip resolves anything
+        # the parallel pre-fetch may have missed
+        print_warning(f"Parallel download failed ({e}), retrying with plain pip install")
+        try:
+            cmd = [sys.executable, "-m", "pip", "install"] + packages
+            subprocess.run(cmd, check=True, **output_kwargs)
+            print_success("Package installation completed")
+            return True
+        except subprocess.CalledProcessError as e2:
+            print_error(f"Failed to install packages: {e2}")
+            return False
+
+
+# Results of the setup checks persist here; a re-run within the TTL skips
+# the checks that already passed unless --force is given
+_STATE_FILE = Path.home() / ".cache" / "areai-setup" / "state.json"
+_STATE_TTL = 3600.0
+
+
+def _load_state() -> Dict:
+    """Read the persisted setup state, discarding it once stale.
+
+    Returns:
+        Dict: State from a run within the last hour, or {}
+    """
+    try:
+        with open(_STATE_FILE) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if time.time() - state.get("timestamp", 0) >= _STATE_TTL:
+        return {}
+    return state
+
+
+def _save_state(state: Dict) -> None:
+    """Persist the setup state with a fresh timestamp; failures are non-fatal."""
+    state["timestamp"] = time.time()
+    try:
+        _STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(_STATE_FILE, 'w') as f:
+            json.dump(state, f)
+    except OSError:
+        pass
+
+
+# gcloud results persist here so re-running setup (or a later deploy)
+# skips the ~600ms CLI startup per call
+_GCLOUD_CACHE_FILE = Path.home() / ".cache" / "areai-setup" / "gcloud.json"
+
+
+def _load_gcloud_cache() -> Dict[str, list]:
+    """Read the on-disk gcloud result cache, tolerating a missing file."""
+    try:
+        with open(_GCLOUD_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_gcloud_cache(cache: Dict[str, list]) -> None:
+    """Persist the gcloud result cache; failures are non-fatal."""
+    try:
+        _GCLOUD_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(_GCLOUD_CACHE_FILE, 'w') as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+
+# In-process memo over the disk cache so concurrent prefetch results are
+# visible even if two threads race on the cache file write
+_GCLOUD_MEMO: Dict[str, list] = {}
+
+
+def run_gcloud_cached(argv: List[str], ttl: Optional[float] = 60.0) -> subprocess.CompletedProcess:
+    """Run a gcloud command, reusing a recent cached result when available.
+
+    Results are keyed on the full argv and stored on disk, so a second
+    setup.py run (or another script using the same cache) answers the
+    static checks in milliseconds instead of paying gcloud startup again.
+    Only successful runs are cached.
+
+    Args:
+        argv: Full gcloud command line
+        ttl: Seconds a cached result stays valid; None means forever
+            (use for outputs like --version that only change on upgrade)
+
+    Returns:
+        subprocess.CompletedProcess: Result with text stdout/stderr
+    """
+    key = " ".join(argv)
+    cache = _load_gcloud_cache()
+    entry = _GCLOUD_MEMO.get(key) or cache.get(key)
+    if entry:
+        timestamp, returncode, stdout, stderr = entry
+        if ttl is None or time.time() - timestamp < ttl:
+            return subprocess.CompletedProcess(argv, returncode, stdout, stderr)
+
+    result = subprocess.run(
+        argv,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+
+    if result.returncode == 0:
+        entry = [time.time(), result.returncode, result.stdout, result.stderr]
+        _GCLOUD_MEMO[key] = entry
+        cache[key] = entry
+        _save_gcloud_cache(cache)
+
+    return result
+
+
+def prefetch_gcloud_checks() -> None:
+    """Warm the gcloud cache for the independent checks concurrently.
+
+    The SDK version, auth list, and project lookups don't depend on each
+    other, so issuing them in parallel means the later sequential steps
+    answer from cache and total gcloud time is the slowest call rather
+    than the sum.
+    """
+    lookups = [
+        (["gcloud", "--version"], None),
+        (["gcloud", "auth", "list"], 60.0),
+        (["gcloud", "config", "get-value", "project"], 60.0),
+    ]
+    with ThreadPoolExecutor(max_workers=len(lookups)) as executor:
+        futures = [executor.submit(run_gcloud_cached, argv, ttl) for argv, ttl in lookups]
+        for future in futures:
+            try:
+                future.result()
+            except (OSError, subprocess.SubprocessError):
+                # A missing gcloud is reported by the sequential checks
+                pass
 
 
 def check_gcloud_sdk() -> bool:
@@ -197,13 +409,9 @@ def check_gcloud_sdk() -> bool:
         bool: True if gcloud is installed, False otherwise
     """
     try:
-        result = subprocess.run(
-            ["gcloud", "--version"], 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
+        # An installed SDK version only changes on upgrade; cache it forever
+        result = run_gcloud_cached(["gcloud", "--version"], ttl=None)
+
         if result.returncode == 0:
             version_line = result.stdout.splitlines()[0]
             print_success(f"Google Cloud SDK is installed: {version_line}")
@@ -216,20 +424,59 @@ def check_gcloud_sdk() -> bool:
         return False
 
 
+# gcloud's own config file; reading it directly beats forking the CLI
+_GCLOUD_CONFIG_FILE = Path.home() / ".config" / "gcloud" / "configurations" / "config_default"
+
+
+def _read_gcloud_config() -> Dict[str, str]:
+    """Read gcloud's default configuration file without a subprocess.
+
+    Returns:
+        Dict[str, str]: core section values (account, project, ...) or {}
+    """
+    import configparser
+
+    parser = configparser.ConfigParser()
+    try:
+        parser.read(_GCLOUD_CONFIG_FILE)
+    except (OSError, configparser.Error):
+        return {}
+
+    if parser.has_section("core"):
+        return dict(parser["core"])
+    return {}
+
+
 def check_gcloud_auth() -> bool:
     """Check if user is authenticated with gcloud.
-    
+
+    Tries Application Default Credentials in-process first, which avoids
+    the gcloud fork entirely; falls back to the CLI if google-auth is not
+    importable or no ADC is configured.
+
     Returns:
         bool: True if authenticated, False otherwise
     """
     try:
-        result = subprocess.run(
-            ["gcloud", "auth", "list"], 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
+        import google.auth
+        import google.auth.exceptions
+        from google.auth.transport.requests import Request
+
+        credentials, _ = google.auth.default()
+        credentials.refresh(Request())
+        account = (_read_gcloud_config().get("account")
+                   or getattr(credentials, "service_account_email", None)
+                   or "application default credentials")
+        print_success(f"Authenticated with Google Cloud as: {account}")
+        return True
+    except ImportError:
+        pass
+    except google.auth.exceptions.GoogleAuthError:
+        pass
+
+    try:
+        result = run_gcloud_cached(["gcloud", "auth", "list"])
+
         if result.returncode == 0 and "No credentialed accounts." not in result.stdout:
             account = None
             for line in result.stdout.splitlines():
@@ -251,20 +498,40 @@ def check_gcloud_auth() -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=1)
 def get_current_project() -> Optional[str]:
     """Get the current Google Cloud project.
-    
+
+    Checks the GOOGLE_CLOUD_PROJECT / GCP_PROJECT environment variables,
+    then Application Default Credentials, then gcloud's config file, and
+    only shells out to the CLI as a last resort. Memoized for the process.
+
     Returns:
         Optional[str]: Project ID if set, None otherwise
     """
+    project = os.environ.get("GOOGLE_CLOUD_PROJECT") or os.environ.get("GCP_PROJECT")
+    if project:
+        return project
+
     try:
-        result = subprocess.run(
-            ["gcloud", "config", "get-value", "project"], 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
+        import google.auth
+        import google.auth.exceptions
+
+        _, project = google.auth.default()
+        if project:
+            return project
+    except ImportError:
+        pass
+    except google.auth.exceptions.GoogleAuthError:
+        pass
+
+    project = _read_gcloud_config().get("project")
+    if project:
+        return project
+
+    try:
+        result = run_gcloud_cached(["gcloud", "config", "get-value", "project"])
+
         if result.returncode == 0 and result.stdout.strip() and result.stdout.strip() != "(unset)":
             return result.stdout.strip()
         else:
@@ -273,48 +540,65 @@ def get_current_project() -> Optional[str]:
         return None
 
 
-def check_api_enabled(project_id: str, api: str) -> bool:
-    """Check if a specific API is enabled for the project.
-    
+def list_enabled_apis(project_id: str) -> set:
+    """List all enabled APIs for the project in one gcloud call.
+
+    One services list instead of a filtered call per API; membership is
+    then tested in memory.
+
     Args:
         project_id: Google Cloud project ID
-        api: API identifier
-        
+
     Returns:
-        bool: True if API is enabled, False otherwise
+        set: Enabled API identifiers (empty on failure)
     """
     try:
-        result = subprocess.run(
-            ["gcloud", "services", "list", "--project", project_id, "--filter", f"config.name:{api}"], 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        return result.returncode == 0 and api in result.stdout
+        result = run_gcloud_cached(
+            ["gcloud", "services", "list", "--enabled",
+             "--project", project_id, "--format", "value(config.name)"])
+
+        if result.returncode == 0:
+            return set(result.stdout.split())
+        return set()
     except subprocess.CalledProcessError:
-        return False
+        return set()
 
 
-def enable_api(project_id: str, api: str, verbose: bool = False) -> bool:
-    """Enable a specific API for the project.
-    
+def enable_apis(project_id: str, apis: List[str], verbose: bool = False) -> bool:
+    """Enable the given APIs for the project in a single gcloud call.
+
+    gcloud services enable accepts multiple API names, so one invocation
+    pays the CLI startup once and lets GCP process the batch server-side.
+
     Args:
         project_id: Google Cloud project ID
-        api: API identifier
+        apis: API identifiers to enable
         verbose: Whether to show detailed output
-        
+
     Returns:
-        bool: True if API was enabled successfully, False otherwise
+        bool: True if the batch was enabled successfully, False otherwise
     """
+    if not apis:
+        return True
+
     try:
-        cmd = ["gcloud", "services", "enable", api, "--project", project_id]
-        
+        cmd = ["gcloud", "services", "enable", *apis, "--project", project_id]
+
         if verbose:
             subprocess.run(cmd, check=True)
         else:
-            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # Drop any cached services list so the follow-up check re-queries
+        cache = _load_gcloud_cache()
+        stale = [key for key in cache if key.startswith("gcloud services list")]
+        if stale:
+            for key in stale:
+                del cache[key]
+            _save_gcloud_cache(cache)
+        for key in [k for k in _GCLOUD_MEMO if k.startswith("gcloud services list")]:
+            del _GCLOUD_MEMO[key]
+
         return True
     except subprocess.CalledProcessError:
         return False
@@ -332,7 +616,7 @@ def create_config_file(config_path: str, config_values: Dict[str, str]) -> bool:
     """
     try:
         with open(config_path, 'w') as f:
-            f.write(CONFIG_TEMPLATE.format(**config_values))
+            f.write(_CONFIG_TEMPLATE.safe_substitute(config_values))
         
         print_success(f"Created configuration file: {config_path}")
         return True
@@ -343,119 +627,182 @@ def create_config_file(config_path: str, config_values: Dict[str, str]) -> bool:
 
 def main():
     """Main function."""
+    # argparse is only needed when running as a script; keep it off the
+    # import path for callers that just use the check helpers
+    import argparse
+
     parser = argparse.ArgumentParser(description='Setup script for Auto Reply Email system')
     parser.add_argument('--install-deps', action='store_true', help='Install missing dependencies')
     parser.add_argument('--check-only', action='store_true', help='Only check requirements without setup')
     parser.add_argument('--verbose', action='store_true', help='Show detailed output')
-    
+    parser.add_argument('--force', action='store_true', help='Ignore cached setup state and re-run every check')
+    parser.add_argument('--project-id', dest='project_id',
+                        help='Google Cloud project ID (skips the prompt; '
+                             'GOOGLE_CLOUD_PROJECT / GCP_PROJECT are also honored)')
+    parser.add_argument('--config', help='JSON file providing configuration values; unset fields are prompted')
+    for key, prompt, default in CONFIG_FIELDS:
+        parser.add_argument('--' + key.replace('_', '-'), dest=key,
+                            help=f'{prompt} (default: {default or "none"})')
+
     args = parser.parse_args()
+
+    file_values = {}
+    if args.config:
+        try:
+            with open(args.config) as f:
+                file_values = json.load(f)
+        except (OSError, ValueError) as e:
+            print_error(f"Failed to read config file {args.config}: {e}")
+            sys.exit(1)
     
     print("\n🔧 Auto Reply Email System Setup")
     print("===============================")
-    
+
+    # Only passed checks are recorded, so anything that failed last time is
+    # re-run; --force discards the state entirely
+    state = {} if args.force else _load_state()
+
     # Step 1: Check Python version
     print_step("Checking Python version")
-    python_ok = check_python_version()
-    if not python_ok:
-        print_warning("Please upgrade to Python 3.7 or higher")
+    if state.get("python_ok"):
+        print_success("Python version check passed on a recent run (--force to re-check)")
+        python_ok = True
+    else:
+        python_ok = check_python_version()
+        if python_ok:
+            state["python_ok"] = True
+        else:
+            print_warning("Please upgrade to Python 3.7 or higher")
     
     # Step 2: Check required packages
     print_step("Checking required packages")
-    installed_packages, missing_packages = check_installed_packages()
-    
-    if installed_packages:
-        print_success(f"Found {len(installed_packages)} installed packages")
-        if args.verbose:
-            for pkg in installed_packages:
+    if state.get("packages_ok"):
+        print_success("All required packages were installed on a recent run (--force to re-check)")
+        missing_packages = []
+    else:
+        installed_packages, missing_packages = check_installed_packages()
+
+        if installed_packages:
+            print_success(f"Found {len(installed_packages)} installed packages")
+            if args.verbose:
+                for pkg in installed_packages:
+                    print(f"  - {pkg}")
+
+        if missing_packages:
+            print_warning(f"Missing {len(missing_packages)} required packages")
+            for pkg in missing_packages:
                 print(f"  - {pkg}")
-    
-    if missing_packages:
-        print_warning(f"Missing {len(missing_packages)} required packages")
-        for pkg in missing_packages:
-            print(f"  - {pkg}")
-        
-        if args.install_deps:
-            install_packages(missing_packages, args.verbose)
+
+            if args.install_deps:
+                install_packages(missing_packages, args.verbose)
+            else:
+                print_info("Run with --install-deps to install missing packages")
         else:
-            print_info("Run with --install-deps to install missing packages")
-    else:
-        print_success("All required packages are installed")
-    
+            print_success("All required packages are installed")
+            state["packages_ok"] = True
+
     if args.check_only:
+        _save_state(state)
         sys.exit(0 if python_ok and not missing_packages else 1)
-    
+
+    # Steps 3-5 all shell out to gcloud; warm the cache in parallel so the
+    # sequential checks below answer immediately
+    if not (state.get("gcloud_ok") and state.get("auth_ok") and state.get("gcloud_project")):
+        prefetch_gcloud_checks()
+
     # Step 3: Check Google Cloud SDK
     print_step("Checking Google Cloud SDK")
-    gcloud_ok = check_gcloud_sdk()
-    
-    if not gcloud_ok:
-        print_info("Please install Google Cloud SDK: https://cloud.google.com/sdk/docs/install")
-        sys.exit(1)
-    
+    if state.get("gcloud_ok"):
+        print_success("Google Cloud SDK found on a recent run (--force to re-check)")
+    else:
+        gcloud_ok = check_gcloud_sdk()
+
+        if not gcloud_ok:
+            print_info("Please install Google Cloud SDK: https://cloud.google.com/sdk/docs/install")
+            sys.exit(1)
+        state["gcloud_ok"] = True
+
     # Step 4: Check Google Cloud authentication
     print_step("Checking Google Cloud authentication")
-    auth_ok = check_gcloud_auth()
-    
-    if not auth_ok:
-        print_info("Please authenticate with Google Cloud:")
-        print("  gcloud auth login")
-        sys.exit(1)
+    if state.get("auth_ok"):
+        print_success("Google Cloud authentication verified on a recent run (--force to re-check)")
+    else:
+        auth_ok = check_gcloud_auth()
+
+        if not auth_ok:
+            print_info("Please authenticate with Google Cloud:")
+            print("  gcloud auth login")
+            sys.exit(1)
+        state["auth_ok"] = True
     
     # Step 5: Check current project
     print_step("Checking Google Cloud project")
-    current_project = get_current_project()
-    
+    current_project = (args.project_id or file_values.get("project_id")
+                       or state.get("gcloud_project"))
+
     if current_project:
-        print_success(f"Current project: {current_project}")
-        use_current = input("Use this project for Auto Reply Email system? (y/n): ").lower() == 'y'
-        
-        if not use_current:
-            current_project = input("Enter Google Cloud project ID: ")
+        print_success(f"Using project: {current_project}")
     else:
-        print_warning("No Google Cloud project is currently set")
-        current_project = input("Enter Google Cloud project ID: ")
+        current_project = get_current_project()
+
+        if current_project:
+            print_success(f"Current project: {current_project}")
+            use_current = input("Use this project for Auto Reply Email system? (y/n): ").lower() == 'y'
+
+            if not use_current:
+                current_project = input("Enter Google Cloud project ID: ")
+        else:
+            print_warning("No Google Cloud project is currently set")
+            current_project = input("Enter Google Cloud project ID: ")
     
+    state["gcloud_project"] = current_project
+
     # Step 6: Check required APIs
     print_step("Checking required APIs")
     apis_to_enable = []
-    
+    enabled_apis = set(state.get("apis_enabled", [])) or list_enabled_apis(current_project)
+
     for api in REQUIRED_APIS:
-        if check_api_enabled(current_project, api):
+        if api in enabled_apis:
             print_success(f"API enabled: {api}")
         else:
             print_warning(f"API not enabled: {api}")
             apis_to_enable.append(api)
     
     if apis_to_enable:
-        enable_apis = input("Enable required APIs? (y/n): ").lower() == 'y'
-        
-        if enable_apis:
-            for api in apis_to_enable:
-                print_info(f"Enabling API: {api}")
-                if enable_api(current_project, api, args.verbose):
-                    print_success(f"Enabled API: {api}")
-                else:
-                    print_error(f"Failed to enable API: {api}")
-    
+        do_enable = input("Enable required APIs? (y/n): ").lower() == 'y'
+
+        if do_enable:
+            print_info(f"Enabling {len(apis_to_enable)} APIs: {', '.join(apis_to_enable)}")
+            if enable_apis(current_project, apis_to_enable, args.verbose):
+                # Re-query so failures inside the batch are reported per API
+                enabled_apis = list_enabled_apis(current_project)
+                for api in apis_to_enable:
+                    if api in enabled_apis:
+                        print_success(f"Enabled API: {api}")
+                    else:
+                        print_error(f"Failed to enable API: {api}")
+            else:
+                print_error("Failed to enable APIs")
+
+    if enabled_apis:
+        state["apis_enabled"] = sorted(enabled_apis)
+    _save_state(state)
+
     # Step 7: Create configuration
     print_step("Creating configuration")
     
-    config_values = {
-        "project_id": current_project,
-        "region": input("Enter GCP region (default: us-central1): ") or "us-central1",
-        "pubsub_topic": input("Enter Pub/Sub topic name (default: gmail-notifications): ") or "gmail-notifications",
-        "oauth_secret": input("Enter OAuth secret name (default: gmail-oauth-token): ") or "gmail-oauth-token",
-        "function_name": input("Enter Cloud Function name (default: process-email): ") or "process-email",
-        "function_timeout": input("Enter Cloud Function timeout in seconds (default: 60): ") or "60",
-        "function_memory": input("Enter Cloud Function memory in MB (default: 256): ") or "256",
-        "vertex_ai_model": input("Enter Vertex AI model name (default: gemini-1.0-pro): ") or "gemini-1.0-pro",
-        "response_timeout": input("Enter response timeout in seconds (default: 15): ") or "15",
-        "customer_api_endpoint": input("Enter Customer API endpoint (default: https://example.com/api/v1/customers): ") or "https://example.com/api/v1/customers",
-        "customer_api_key": input("Enter Customer API key (leave blank for none): ") or "",
-        "log_level": input("Enter log level (default: INFO): ") or "INFO",
-        "enable_mock_customer_api": input("Enable mock Customer API for testing? (true/false, default: true): ") or "true",
-        "enable_fallback_responses": input("Enable fallback responses? (true/false, default: true): ") or "true"
-    }
+    # Flags beat the config file, which beats an interactive prompt; a full
+    # config file (or full flags) makes the whole step non-interactive
+    config_values = {"project_id": current_project}
+    for key, prompt, default in CONFIG_FIELDS:
+        value = getattr(args, key, None)
+        if value is None:
+            value = file_values.get(key)
+        if value is None:
+            suffix = f" (default: {default}): " if default else ": "
+            value = input(prompt + suffix) or default
+        config_values[key] = value
     
     config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.env")
     create_config_file(config_path, config_values)
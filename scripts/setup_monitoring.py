@@ -5,62 +5,202 @@
 Setup monitoring dashboard and alerts for Auto Reply Email system
 """
 
-import argparse
+import functools
 import json
 import os
+import shlex
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+try:
+    import orjson
 
-def run_command(cmd, capture_output=True, exit_on_error=True):
+    def _json_dumps(obj, indent=False):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj, indent=False):
+        return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+    _json_loads = json.loads
+
+
+# Operators and expansions that actually need a shell; quoting alone does
+# not, since shlex strips it the same way the shell would
+_SHELL_CHARS = frozenset("|&;<>$`*?~#\\\n")
+
+
+def run_command(cmd, capture_output=True, exit_on_error=True, stdin_data=None):
     """Run a shell command.
-    
+
+    Argv lists are executed directly without a shell; command strings
+    without shell operators are tokenized with shlex and also skip the
+    /bin/sh fork, so only strings that genuinely use shell syntax pay
+    for the extra process.
+
     Args:
-        cmd (str): Command to run
+        cmd (list or str): Command to run
         capture_output (bool): Whether to capture output
         exit_on_error (bool): Whether to exit on error
-        
+        stdin_data (bytes or str): Data fed to the command's stdin
+
     Returns:
         tuple: (success, output) where success is a boolean and output is the command output
     """
-    print(f"Running: {cmd}")
+    is_argv = isinstance(cmd, (list, tuple))
+    shown = " ".join(cmd) if is_argv else cmd
+    print(f"Running: {shown}")
     try:
+        if is_argv:
+            argv, use_shell = cmd, False
+        else:
+            use_shell = any(ch in _SHELL_CHARS for ch in cmd)
+            argv = cmd if use_shell else shlex.split(cmd)
+        if isinstance(stdin_data, bytes):
+            stdin_data = stdin_data.decode("utf-8")
         result = subprocess.run(
-            cmd,
-            shell=True,
+            argv,
+            shell=use_shell,
             capture_output=capture_output,
             text=True,
-            check=False
+            check=False,
+            input=stdin_data
         )
-        
+
         if result.returncode != 0:
-            print(f"\033[1;31mError executing command: {cmd}\033[0m")
+            print(f"\033[1;31mError executing command: {shown}\033[0m")
             print(f"\033[1;31mError: {result.stderr}\033[0m")
             if exit_on_error:
                 sys.exit(1)
             return False, result.stderr if capture_output else None
-            
+
         return True, result.stdout if capture_output else None
     except Exception as e:
-        print(f"\033[1;31mException executing command: {cmd}\033[0m")
+        print(f"\033[1;31mException executing command: {shown}\033[0m")
         print(f"\033[1;31mError: {str(e)}\033[0m")
         if exit_on_error:
             sys.exit(1)
         return False, str(e)
 
 
+# Dashboard widgets differ only in these fields; the shared xyChart
+# skeleton is built by _widget
+_WIDGET_SPECS = (
+    ("Email Processing Rate",
+     "metric.type=\"cloudfunctions.googleapis.com/function/execution_count\" resource.type=\"cloud_function\" resource.label.\"function_name\"=\"auto-reply-email\"",
+     "ALIGN_RATE", "1"),
+    ("Response Generation Time",
+     "metric.type=\"logging.googleapis.com/user/vertex_ai_response_time\" resource.type=\"cloud_function\" resource.label.\"function_name\"=\"auto-reply-email\"",
+     "ALIGN_PERCENTILE_99", "s"),
+    ("Function Execution Time",
+     "metric.type=\"cloudfunctions.googleapis.com/function/execution_times\" resource.type=\"cloud_function\" resource.label.\"function_name\"=\"auto-reply-email\"",
+     "ALIGN_PERCENTILE_95", "ms"),
+    ("Error Count",
+     "metric.type=\"logging.googleapis.com/log_entry_count\" resource.type=\"cloud_function\" resource.label.\"function_name\"=\"auto-reply-email\" severity>=\"ERROR\"",
+     "ALIGN_COUNT", "1"),
+)
+
+
+def _widget(title, metric_filter, aligner, unit):
+    """Build one xyChart dashboard widget from its varying fields.
+
+    Args:
+        title (str): Widget title
+        metric_filter (str): Monitoring filter expression
+        aligner (str): Per-series aligner
+        unit (str): Unit override
+
+    Returns:
+        dict: Widget definition
+    """
+    return {
+        "title": title,
+        "xyChart": {
+            "dataSets": [
+                {
+                    "timeSeriesQuery": {
+                        "timeSeriesFilter": {
+                            "filter": metric_filter,
+                            "aggregation": {
+                                "alignmentPeriod": "60s",
+                                "perSeriesAligner": aligner
+                            }
+                        },
+                        "unitOverride": unit
+                    },
+                    "plotType": "LINE",
+                    "targetAxis": "Y1"
+                }
+            ],
+            "timeshiftDuration": "0s",
+            "yAxis": {
+                "label": "y1Axis",
+                "scale": "LINEAR"
+            }
+        }
+    }
+
+
+# Probe results persist here so a rerun within the TTL skips the gcloud
+# calls entirely
+_PROBE_CACHE_FILE = Path.home() / ".cache" / "areai" / "monitoring_setup.json"
+_PROBE_CACHE_TTL = 600
+
+
+def _load_probe_cache():
+    """Read the persisted probe results, discarding stale or mismatched state.
+
+    Returns:
+        dict: Cached probe results, or {} when expired or recorded under a
+            different GCP_PROJECT_ID
+    """
+    try:
+        with open(_PROBE_CACHE_FILE, "rb") as f:
+            cache = _json_loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+    if time.time() - cache.get("timestamp", 0) >= _PROBE_CACHE_TTL:
+        return {}
+    if cache.get("env_project") != os.environ.get("GCP_PROJECT_ID"):
+        return {}
+    return cache
+
+
+def _update_probe_cache(**entries):
+    """Merge probe results into the cache file; failures are non-fatal."""
+    cache = _load_probe_cache()
+    cache.update(entries)
+    cache["timestamp"] = time.time()
+    cache["env_project"] = os.environ.get("GCP_PROJECT_ID")
+    try:
+        _PROBE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(_PROBE_CACHE_FILE, "wb") as f:
+            f.write(_json_dumps(cache))
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=1)
 def get_project_id():
     """Get GCP project ID.
-    
+
+    Memoized for the process and persisted across runs, so only the first
+    invocation within the cache TTL pays for the gcloud lookup.
+
     Returns:
         str: GCP project ID
     """
     project_id = os.environ.get("GCP_PROJECT_ID")
+    if not project_id:
+        project_id = _load_probe_cache().get("project_id")
     if not project_id:
         print("\033[1;36mChecking current GCP project...\033[0m")
-        success, output = run_command("gcloud config get-value project", exit_on_error=False)
+        success, output = run_command(["gcloud", "config", "get-value", "project"], exit_on_error=False)
         
         if success and output and output.strip() != "(unset)":
             project_id = output.strip()
@@ -70,66 +210,87 @@ def get_project_id():
             if not project_id:
                 print("\033[1;31mProject ID is required. Exiting.\033[0m")
                 sys.exit(1)
-    
+
+    _update_probe_cache(project_id=project_id)
     return project_id
 
 
+@functools.lru_cache(maxsize=1)
+def _channel_client():
+    """Shared notification-channel client (one gRPC channel per process).
+
+    monitoring_v3's import chain pulls in grpc and protobuf, so defer it
+    until a client is actually needed.
+    """
+    from google.cloud import monitoring_v3
+
+    return monitoring_v3.NotificationChannelServiceClient()
+
+
+@functools.lru_cache(maxsize=1)
+def _alert_client():
+    """Shared alert-policy client (one gRPC channel per process)."""
+    from google.cloud import monitoring_v3
+
+    return monitoring_v3.AlertPolicyServiceClient()
+
+
 def create_notification_channel(project_id, channel_type, display_name, email=None):
     """Create a notification channel.
-    
+
+    Uses the Monitoring client instead of gcloud: no CLI startup per call
+    and the channel name comes back as a field rather than scraped text.
+
     Args:
         project_id (str): GCP project ID
         channel_type (str): Channel type (email, sms, etc.)
         display_name (str): Display name
         email (str): Email address for email channel
-        
+
     Returns:
         str: Notification channel name or None if failed
     """
     print(f"\033[1;36mCreating notification channel: {display_name}\033[0m")
-    
+
+    from google.api_core.exceptions import GoogleAPICallError
+    from google.cloud import monitoring_v3
+
+    client = _channel_client()
+    parent = f"projects/{project_id}"
+
     # First check if a channel with this email already exists
     if channel_type == "email" and email:
         print(f"Checking for existing notification channels for {email}...")
-        success, list_result = run_command(
-            f"gcloud alpha monitoring channels list --project={project_id} --filter=\"labels.email_address='{email}'\"", 
-            exit_on_error=False
-        )
-        
-        if success and list_result and "name:" in list_result:
-            # Extract channel name from output
-            for line in list_result.splitlines():
-                if line.startswith("name:"):
-                    channel_name = line.split("name:")[1].strip()
-                    print(f"\033[1;32mFound existing notification channel for {email}: {channel_name}\033[0m")
-                    return channel_name
-    
+        try:
+            channels = client.list_notification_channels(request={
+                "name": parent,
+                "filter": f'type="email" AND labels.email_address="{email}"'
+            })
+            for channel in channels:
+                print(f"\033[1;32mFound existing notification channel for {email}: {channel.name}\033[0m")
+                return channel.name
+        except GoogleAPICallError as e:
+            print(f"\033[1;33mCould not list existing channels: {e}\033[0m")
+
     # Create new channel
-    cmd = [
-        f"gcloud alpha monitoring channels create",
-        f"--project={project_id}",
-        f"--display-name='{display_name}'",
-        f"--type={channel_type}"
-    ]
-    
+    channel = monitoring_v3.NotificationChannel(
+        type_=channel_type,
+        display_name=display_name
+    )
     if channel_type == "email" and email:
-        cmd.append(f"--channel-labels=email_address={email}")
-    
-    success, result = run_command(" ".join(cmd), exit_on_error=False)
-    
-    if not success:
-        print(f"\033[1;31mFailed to create notification channel\033[0m")
+        channel.labels["email_address"] = email
+
+    try:
+        created = client.create_notification_channel(request={
+            "name": parent,
+            "notification_channel": channel
+        })
+    except GoogleAPICallError as e:
+        print(f"\033[1;31mFailed to create notification channel: {e}\033[0m")
         return None
-        
-    # Extract channel name from output
-    for line in result.splitlines():
-        if line.startswith("name:"):
-            channel_name = line.split("name:")[1].strip()
-            print(f"\033[1;32mCreated notification channel: {channel_name}\033[0m")
-            return channel_name
-    
-    print("\033[1;31mCould not extract channel name from output\033[0m")
-    return None
+
+    print(f"\033[1;32mCreated notification channel: {created.name}\033[0m")
+    return created.name
 
 
 def generate_dashboard_template(output_file):
@@ -147,122 +308,17 @@ def generate_dashboard_template(output_file):
         "displayName": "Auto Reply Email System Dashboard",
         "gridLayout": {
             "columns": 2,
-            "widgets": [
-                {
-                    "title": "Email Processing Rate",
-                    "xyChart": {
-                        "dataSets": [
-                            {
-                                "timeSeriesQuery": {
-                                    "timeSeriesFilter": {
-                                        "filter": "metric.type=\"cloudfunctions.googleapis.com/function/execution_count\" resource.type=\"cloud_function\" resource.label.\"function_name\"=\"auto-reply-email\"",
-                                        "aggregation": {
-                                            "alignmentPeriod": "60s",
-                                            "perSeriesAligner": "ALIGN_RATE"
-                                        }
-                                    },
-                                    "unitOverride": "1"
-                                },
-                                "plotType": "LINE",
-                                "targetAxis": "Y1"
-                            }
-                        ],
-                        "timeshiftDuration": "0s",
-                        "yAxis": {
-                            "label": "y1Axis",
-                            "scale": "LINEAR"
-                        }
-                    }
-                },
-                {
-                    "title": "Response Generation Time",
-                    "xyChart": {
-                        "dataSets": [
-                            {
-                                "timeSeriesQuery": {
-                                    "timeSeriesFilter": {
-                                        "filter": "metric.type=\"logging.googleapis.com/user/vertex_ai_response_time\" resource.type=\"cloud_function\" resource.label.\"function_name\"=\"auto-reply-email\"",
-                                        "aggregation": {
-                                            "alignmentPeriod": "60s",
-                                            "perSeriesAligner": "ALIGN_PERCENTILE_99"
-                                        }
-                                    },
-                                    "unitOverride": "s"
-                                },
-                                "plotType": "LINE",
-                                "targetAxis": "Y1"
-                            }
-                        ],
-                        "timeshiftDuration": "0s",
-                        "yAxis": {
-                            "label": "y1Axis",
-                            "scale": "LINEAR"
-                        }
-                    }
-                },
-                {
-                    "title": "Function Execution Time",
-                    "xyChart": {
-                        "dataSets": [
-                            {
-                                "timeSeriesQuery": {
-                                    "timeSeriesFilter": {
-                                        "filter": "metric.type=\"cloudfunctions.googleapis.com/function/execution_times\" resource.type=\"cloud_function\" resource.label.\"function_name\"=\"auto-reply-email\"",
-                                        "aggregation": {
-                                            "alignmentPeriod": "60s",
-                                            "perSeriesAligner": "ALIGN_PERCENTILE_95"
-                                        }
-                                    },
-                                    "unitOverride": "ms"
-                                },
-                                "plotType": "LINE",
-                                "targetAxis": "Y1"
-                            }
-                        ],
-                        "timeshiftDuration": "0s",
-                        "yAxis": {
-                            "label": "y1Axis",
-                            "scale": "LINEAR"
-                        }
-                    }
-                },
-                {
-                    "title": "Error Count",
-                    "xyChart": {
-                        "dataSets": [
-                            {
-                                "timeSeriesQuery": {
-                                    "timeSeriesFilter": {
-                                        "filter": "metric.type=\"logging.googleapis.com/log_entry_count\" resource.type=\"cloud_function\" resource.label.\"function_name\"=\"auto-reply-email\" severity>=\"ERROR\"",
-                                        "aggregation": {
-                                            "alignmentPeriod": "60s",
-                                            "perSeriesAligner": "ALIGN_COUNT"
-                                        }
-                                    },
-                                    "unitOverride": "1"
-                                },
-                                "plotType": "LINE",
-                                "targetAxis": "Y1"
-                            }
-                        ],
-                        "timeshiftDuration": "0s",
-                        "yAxis": {
-                            "label": "y1Axis",
-                            "scale": "LINEAR"
-                        }
-                    }
-                }
-            ]
+            "widgets": [_widget(*spec) for spec in _WIDGET_SPECS]
         }
     }
-    
+
     try:
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
         
         # Write dashboard template
-        with open(output_file, "w") as f:
-            json.dump(dashboard, f, indent=2)
+        with open(output_file, "wb") as f:
+            f.write(_json_dumps(dashboard, indent=True))
         
         print(f"\033[1;32mDashboard template generated at {output_file}\033[0m")
         return True
@@ -271,6 +327,32 @@ def generate_dashboard_template(output_file):
         return False
 
 
+def _substitute_placeholders(obj, mapping):
+    """Recursively replace ${KEY} placeholders in the structure's strings.
+
+    One walk over the parsed document instead of serializing it, editing
+    the whole string, and parsing it back.
+
+    Args:
+        obj: Parsed JSON structure (dicts, lists, scalars)
+        mapping (dict): Placeholder name to replacement value
+
+    Returns:
+        The structure with placeholders substituted
+    """
+    if isinstance(obj, str):
+        for key, value in mapping.items():
+            token = "${" + key + "}"
+            if token in obj:
+                obj = obj.replace(token, value)
+        return obj
+    if isinstance(obj, dict):
+        return {key: _substitute_placeholders(value, mapping) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_substitute_placeholders(value, mapping) for value in obj]
+    return obj
+
+
 def deploy_dashboard(project_id, dashboard_file):
     """Deploy monitoring dashboard.
     
@@ -298,32 +380,29 @@ def deploy_dashboard(project_id, dashboard_file):
     
     try:
         # Read dashboard JSON
-        with open(dashboard_file, "r") as f:
-            dashboard_json = json.load(f)
+        with open(dashboard_file, "rb") as f:
+            dashboard_json = _json_loads(f.read())
         
         # Replace project ID placeholder if present
-        dashboard_str = json.dumps(dashboard_json)
-        if "${PROJECT_ID}" in dashboard_str:
-            dashboard_str = dashboard_str.replace("${PROJECT_ID}", project_id)
-            dashboard_json = json.loads(dashboard_str)
-        
-        # Write to temporary file
-        temp_file = "/tmp/dashboard.json"
-        with open(temp_file, "w") as f:
-            json.dump(dashboard_json, f, indent=2)
-        
-        # Deploy dashboard
-        cmd = f"gcloud monitoring dashboards create --project={project_id} --config-from-file={temp_file}"
-        success, output = run_command(cmd, exit_on_error=False)
-        
+        dashboard_json = _substitute_placeholders(dashboard_json, {"PROJECT_ID": project_id})
+
+        # Pipe the config straight to gcloud's stdin; no temp file round
+        # trip. --format=json gives the created resource as a parseable
+        # document instead of text to scrape.
+        cmd = ["gcloud", "monitoring", "dashboards", "create", f"--project={project_id}",
+               "--config-from-file=-", "--format=json"]
+        success, output = run_command(cmd, exit_on_error=False,
+                                      stdin_data=_json_dumps(dashboard_json))
+
         if success:
             print("\033[1;32mDashboard deployed successfully\033[0m")
-            
-            # Extract dashboard URL if available
-            for line in output.splitlines():
-                if "https://" in line and "console.cloud.google.com" in line:
-                    print(f"\033[1;36mDashboard URL: {line.strip()}\033[0m")
-                    break
+
+            # The resource name carries the dashboard ID for the console URL
+            try:
+                dashboard_id = _json_loads(output)["name"].rsplit("/", 1)[-1]
+                print(f"\033[1;36mDashboard URL: https://console.cloud.google.com/monitoring/dashboards/builder/{dashboard_id}?project={project_id}\033[0m")
+            except (ValueError, KeyError):
+                pass
             return True
         else:
             print("\033[1;31mFailed to deploy dashboard\033[0m")
@@ -436,8 +515,8 @@ def generate_alerts_template(output_file):
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
         
         # Write alerts template
-        with open(output_file, "w") as f:
-            json.dump(alerts, f, indent=2)
+        with open(output_file, "wb") as f:
+            f.write(_json_dumps(alerts, indent=True))
         
         print(f"\033[1;32mAlerts template generated at {output_file}\033[0m")
         return True
@@ -474,34 +553,51 @@ def deploy_alerts(project_id, alerts_file, notification_channels=None):
     
     try:
         # Read alerts JSON
-        with open(alerts_file, "r") as f:
-            alerts_json = json.load(f)
-        
+        with open(alerts_file, "rb") as f:
+            alerts_json = _json_loads(f.read())
+
+        if not alerts_json:
+            print("\033[1;33mAlerts file is empty, nothing to deploy\033[0m")
+            return True
+
+
         # Add notification channels to each alert if provided
         if notification_channels:
             print(f"\033[1;36mAdding notification channels to alerts: {notification_channels}\033[0m")
             for alert in alerts_json:
                 alert["notificationChannels"] = notification_channels
         
-        # Deploy each alert policy
+        # Deploy the policies concurrently over one warm gRPC channel; they
+        # are independent, so wall time is the slowest create rather than
+        # the sum of the round trips
+        from google.api_core.exceptions import GoogleAPICallError
+        from google.cloud import monitoring_v3
+
+        client = _alert_client()
+        parent = f"projects/{project_id}"
+
+        def _deploy_one(alert):
+            policy = monitoring_v3.AlertPolicy.from_json(
+                _json_dumps(alert).decode("utf-8"), ignore_unknown_fields=True)
+            client.create_alert_policy(request={
+                "name": parent,
+                "alert_policy": policy
+            })
+
         success_count = 0
-        for i, alert in enumerate(alerts_json):
-            print(f"\033[1;36mDeploying alert policy '{alert['displayName']}'\033[0m")
-            
-            # Write to temporary file
-            alert_file = f"/tmp/alert_{i}.json"
-            with open(alert_file, "w") as f:
-                json.dump(alert, f, indent=2)
-            
-            # Deploy alert policy
-            cmd = f"gcloud alpha monitoring policies create --project={project_id} --policy-from-file={alert_file}"
-            success, output = run_command(cmd, exit_on_error=False)
-            
-            if success:
-                print(f"\033[1;32mAlert policy '{alert['displayName']}' deployed successfully\033[0m")
-                success_count += 1
-            else:
-                print(f"\033[1;31mFailed to deploy alert policy '{alert['displayName']}'\033[0m")
+        with ThreadPoolExecutor(max_workers=min(16, len(alerts_json))) as executor:
+            futures = {
+                executor.submit(_deploy_one, alert): alert
+                for alert in alerts_json
+            }
+            for future in as_completed(futures):
+                name = futures[future]["displayName"]
+                try:
+                    future.result()
+                    print(f"\033[1;32mAlert policy '{name}' deployed successfully\033[0m")
+                    success_count += 1
+                except GoogleAPICallError as e:
+                    print(f"\033[1;31mFailed to deploy alert policy '{name}': {e}\033[0m")
         
         if success_count == len(alerts_json):
             print(f"\033[1;32mAll {success_count} alert policies deployed successfully\033[0m")
@@ -524,36 +620,60 @@ def check_gcloud_installation():
         bool: True if gcloud is installed, False otherwise
     """
     print("\033[1;36mChecking if gcloud is installed...\033[0m")
-    success, _ = run_command("which gcloud", exit_on_error=False)
+    success, _ = run_command(["which", "gcloud"], exit_on_error=False)
     return success
 
 
+@functools.lru_cache(maxsize=1)
 def check_gcloud_auth():
     """Check if user is authenticated with gcloud.
-    
+
+    A recent positive result is reused from the probe cache; failures are
+    never cached so they always re-probe.
+
     Returns:
         bool: True if authenticated, False otherwise
     """
+    if _load_probe_cache().get("auth_ok"):
+        return True
+
     print("\033[1;36mChecking if user is authenticated with gcloud...\033[0m")
-    success, output = run_command("gcloud auth list --filter=status:ACTIVE --format='value(account)'", exit_on_error=False)
-    return success and output.strip() != ""
+    success, output = run_command(
+        ["gcloud", "auth", "list", "--filter=status:ACTIVE", "--format=value(account)"],
+        exit_on_error=False
+    )
+    authenticated = success and output.strip() != ""
+    if authenticated:
+        _update_probe_cache(auth_ok=True)
+    return authenticated
 
 
+@functools.lru_cache(maxsize=4)
 def check_monitoring_api_enabled(project_id):
     """Check if Cloud Monitoring API is enabled.
-    
+
+    A recent positive result is reused from the probe cache; failures are
+    never cached so they always re-probe.
+
     Args:
         project_id (str): GCP project ID
-        
+
     Returns:
         bool: True if enabled, False otherwise
     """
+    if _load_probe_cache().get("monitoring_api_project") == project_id:
+        return True
+
     print("\033[1;36mChecking if Cloud Monitoring API is enabled...\033[0m")
     success, output = run_command(
-        f"gcloud services list --project={project_id} --filter=name:monitoring.googleapis.com --format='value(name)'",
+        ["gcloud", "services", "list", f"--project={project_id}",
+         "--filter=name:monitoring.googleapis.com", "--format=value(name)"],
         exit_on_error=False
     )
-    return success and "monitoring.googleapis.com" in output
+    enabled = success and "monitoring.googleapis.com" in output
+    if enabled:
+        _update_probe_cache(monitoring_api_project=project_id)
+    return enabled
 
 
 def enable_monitoring_api(project_id):
@@ -567,19 +687,20 @@ def enable_monitoring_api(project_id):
     """
     print("\033[1;36mEnabling Cloud Monitoring API...\033[0m")
     success, _ = run_command(
-        f"gcloud services enable monitoring.googleapis.com --project={project_id}",
+        ["gcloud", "services", "enable", "monitoring.googleapis.com", f"--project={project_id}"],
         exit_on_error=False
     )
     return success
 
 
-def main():
-    """Main function."""
-    # Print banner
-    print("\033[1;32m" + "=" * 80 + "\033[0m")
-    print("\033[1;32m" + " " * 20 + "Auto Reply Email Monitoring Setup" + " " * 20 + "\033[0m")
-    print("\033[1;32m" + "=" * 80 + "\033[0m\n")
-    
+def _build_parser():
+    """Build the argument parser; argparse stays off the import path.
+
+    Returns:
+        argparse.ArgumentParser: Configured parser
+    """
+    import argparse
+
     parser = argparse.ArgumentParser(description="Setup monitoring for Auto Reply Email system")
     parser.add_argument("--project-id", help="GCP project ID")
     parser.add_argument("--dashboard", default="../monitoring/dashboard.json", help="Path to dashboard JSON file")
@@ -589,29 +710,50 @@ def main():
     parser.add_argument("--skip-alerts", action="store_true", help="Skip alerts deployment")
     parser.add_argument("--skip-checks", action="store_true", help="Skip prerequisite checks")
     parser.add_argument("--yes", "-y", action="store_true", help="Automatic yes to prompts")
-    
-    args = parser.parse_args()
-    
+    return parser
+
+
+def main():
+    """Main function."""
+    args = _build_parser().parse_args()
+
+    # Print banner (after parsing so --help exits without it)
+    print("\033[1;32m" + "=" * 80 + "\033[0m")
+    print("\033[1;32m" + " " * 20 + "Auto Reply Email Monitoring Setup" + " " * 20 + "\033[0m")
+    print("\033[1;32m" + "=" * 80 + "\033[0m\n")
+
     # Perform prerequisite checks
+    api_future = None
     if not args.skip_checks:
+        # The probes are independent gcloud calls; run them together so the
+        # prerequisite phase costs the slowest one instead of the sum. The
+        # API check can only join when the project is already known.
+        project_hint = args.project_id or os.environ.get("GCP_PROJECT_ID")
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            install_future = executor.submit(check_gcloud_installation)
+            auth_future = executor.submit(check_gcloud_auth)
+            if project_hint:
+                api_future = executor.submit(check_monitoring_api_enabled, project_hint)
+
         # Check if gcloud is installed
-        if not check_gcloud_installation():
+        if not install_future.result():
             print("\033[1;31mError: gcloud is not installed. Please install the Google Cloud SDK.\033[0m")
             print("Visit https://cloud.google.com/sdk/docs/install for installation instructions.")
             sys.exit(1)
-        
+
         # Check if user is authenticated
-        if not check_gcloud_auth():
+        if not auth_future.result():
             print("\033[1;31mError: Not authenticated with gcloud. Please run 'gcloud auth login'.\033[0m")
             sys.exit(1)
-    
+
     # Get project ID
     project_id = args.project_id or get_project_id()
     print(f"\033[1;36mUsing project ID: {project_id}\033[0m")
-    
+
     # Check if Cloud Monitoring API is enabled
     if not args.skip_checks:
-        if not check_monitoring_api_enabled(project_id):
+        api_enabled = api_future.result() if api_future else check_monitoring_api_enabled(project_id)
+        if not api_enabled:
             print("\033[1;33mCloud Monitoring API is not enabled.\033[0m")
             enable = args.yes or input("Would you like to enable it now? (y/n): ").lower() == "y"
             if enable:
@@ -668,18 +810,31 @@ def main():
     # Track success of operations
     dashboard_success = True
     alerts_success = True
-    
-    # Deploy dashboard
-    if not args.skip_dashboard:
-        dashboard_success = deploy_dashboard(project_id, dashboard_file)
-    else:
-        print("\033[1;33mSkipping dashboard deployment\033[0m")
-    
-    # Deploy alerts
-    if not args.skip_alerts:
-        alerts_success = deploy_alerts(project_id, alerts_file, notification_channels)
+
+    # The dashboard and alert deployments are independent, so overlap them
+    # when both templates already exist; if either might prompt to generate
+    # its template, fall back to the sequential path so stdin stays sane
+    parallel_deploy = (not args.skip_dashboard and not args.skip_alerts
+                       and os.path.exists(dashboard_file) and os.path.exists(alerts_file))
+
+    if parallel_deploy:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            dashboard_future = executor.submit(deploy_dashboard, project_id, dashboard_file)
+            alerts_future = executor.submit(deploy_alerts, project_id, alerts_file, notification_channels)
+        dashboard_success = dashboard_future.result()
+        alerts_success = alerts_future.result()
     else:
-        print("\033[1;33mSkipping alerts deployment\033[0m")
+        # Deploy dashboard
+        if not args.skip_dashboard:
+            dashboard_success = deploy_dashboard(project_id, dashboard_file)
+        else:
+            print("\033[1;33mSkipping dashboard deployment\033[0m")
+
+        # Deploy alerts
+        if not args.skip_alerts:
+            alerts_success = deploy_alerts(project_id, alerts_file, notification_channels)
+        else:
+            print("\033[1;33mSkipping alerts deployment\033[0m")
     
     # Print summary
     print("\n" + "\033[1;32m" + "=" * 80 + "\033[0m")